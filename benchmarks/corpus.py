@@ -0,0 +1,210 @@
+"""
+Synthetic LaTeX projects for benchmarks.
+
+generate_project() writes a compilable-looking arXiv-style project of a chosen size: a main file with a
+preamble of \\newcommand definitions, an abstract, and sections kept in their own files through \\input,
+each with subsections, paragraphs of prose with inline math, citations and references, display
+equations, itemize lists, figures and tables with captions, and (optionally) nested \\input files.
+Generation is seeded, so the same arguments always produce the same project.
+
+Usage:
+    python -m benchmarks.corpus tex-bench/synthetic --sections 20 --scale 10
+"""
+import argparse
+import os
+import random
+
+
+WORDS = (
+    "model translation latent representation attention layer training dataset benchmark baseline "
+    "gradient optimization objective sampling distribution inference encoder decoder token sequence "
+    "accuracy evaluation experiment parameter architecture network transformer embedding loss robust "
+    "efficient scalable method approach result analysis performance improvement feature context "
+    "we propose show demonstrate observe compare achieve outperform introduce study consider describe"
+).split()
+
+
+def generate_project(project_dir: str,
+                     sections: int = 10,
+                     subsections: int = 2,
+                     paragraphs: int = 3,
+                     sentences: int = 5,
+                     figures: int = 1,
+                     tables: int = 1,
+                     equations: int = 1,
+                     lists: int = 1,
+                     newcommands: int = 10,
+                     input_depth: int = 1,
+                     scale: int = 1,
+                     seed: int = 0) -> str:
+    """
+    Write a synthetic LaTeX project to project_dir and return the path of its main file.
+
+    Args:
+        sections: number of \\section, each in its own file included with \\input.
+        subsections: \\subsection per section.
+        paragraphs, sentences: prose per subsection.
+        figures, tables, equations, lists: environments per section (figures and tables carry a \\caption).
+        newcommands: \\newcommand definitions in the preamble, used throughout the text.
+        input_depth: levels of nested \\input below each section file (0 keeps sections in one file each).
+        scale: multiplies sections, so scale=10 gives a project ten times larger.
+        seed: seed of the random generator.
+    """
+    rng = random.Random(seed)
+    sections *= scale
+    os.makedirs(os.path.join(project_dir, "sections"), exist_ok=True)
+    macros = [f"\\mc{_letters(i)}" for i in range(newcommands)]
+
+    preamble = [
+        "\\documentclass{article}",
+        "\\usepackage{amsmath}",
+        "\\usepackage{graphicx}",
+        "\\usepackage{booktabs}",
+        "\\usepackage{hyperref}",
+    ]
+    for k, macro in enumerate(macros):
+        if k % 2:
+            preamble.append(f"\\newcommand{{{macro}}}[1]{{\\mathbf{{#1}}_{{{k}}}}}")
+        else:
+            preamble.append(f"\\newcommand{{{macro}}}{{\\textsc{{{rng.choice(WORDS).capitalize()}}}}}")
+
+    body = [
+        "\\begin{document}",
+        f"\\title{{{_sentence(rng, macros, 8).rstrip('.')}}}",
+        "\\maketitle",
+        "\\begin{abstract}",
+        " ".join(_sentence(rng, macros) for _ in range(sentences)),
+        "\\end{abstract}",
+        "",
+    ]
+    for s in range(1, sections + 1):
+        name = f"sections/sec{s}"
+        body.append(f"\\input{{{name}}}")
+        _write(project_dir, name, _section(rng, s, macros, project_dir, subsections, paragraphs, sentences,
+                                             figures, tables, equations, lists, input_depth))
+    body += ["", "\\end{document}", ""]
+
+    main_path = os.path.join(project_dir, "main.tex")
+    with open(main_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(preamble + [""] + body))
+    return main_path
+
+
+def _section(rng, s, macros, project_dir, subsections, paragraphs, sentences,
+             figures, tables, equations, lists, input_depth) -> str:
+    lines = [f"\\section{{{_sentence(rng, macros, 4).rstrip('.')}}}", f"\\label{{sec:{s}}}", ""]
+    lines += [_paragraph(rng, macros, sentences, s) for _ in range(paragraphs)]
+    for k in range(1, equations + 1):
+        lines += ["\\begin{equation}",
+                  f"  \\mathcal{{L}}_{{{k}}} = \\sum_{{i=1}}^{{N}} \\log p(x_i \\mid \\theta) + \\lambda \\|\\theta\\|^2",
+                  f"  \\label{{eq:{s}-{k}}}",
+                  "\\end{equation}", ""]
+    for k in range(1, figures + 1):
+        lines += ["\\begin{figure}[t]",
+                  "  \\centering",
+                  f"  \\includegraphics[width=0.8\\linewidth]{{figures/fig{s}-{k}.pdf}}",
+                  f"  \\caption{{{_sentence(rng, macros, 12)} {_sentence(rng, macros, 10)}}}",
+                  f"  \\label{{fig:{s}-{k}}}",
+                  "\\end{figure}", ""]
+    for k in range(1, tables + 1):
+        lines += ["\\begin{table}[t]",
+                  "  \\centering",
+                  f"  \\caption{{{_sentence(rng, macros, 10)}}}",
+                  "  \\begin{tabular}{lcc}",
+                  "    \\toprule",
+                  "    Method & Score & Time \\\\",
+                  "    \\midrule"]
+        lines += [f"    {rng.choice(WORDS).capitalize()} & {rng.uniform(50, 99):.1f} & {rng.uniform(1, 9):.2f} \\\\"
+                  for _ in range(4)]
+        lines += ["    \\bottomrule", "  \\end{tabular}", f"  \\label{{tab:{s}-{k}}}", "\\end{table}", ""]
+    for k in range(lists):
+        lines += ["\\begin{itemize}"] + [f"  \\item {_sentence(rng, macros)}" for _ in range(3)] + ["\\end{itemize}", ""]
+
+    for sub in range(1, subsections + 1):
+        lines += [f"\\subsection{{{_sentence(rng, macros, 3).rstrip('.')}}}", ""]
+        lines += [_paragraph(rng, macros, sentences, s) for _ in range(paragraphs)]
+
+    # nested inputs: sec{s} includes sec{s}-1, which includes sec{s}-2, ...
+    if input_depth > 0:
+        lines += [f"\\input{{sections/sec{s}-1}}", ""]
+    for depth in range(1, input_depth + 1):
+        child = [f"\\subsection{{{_sentence(rng, macros, 3).rstrip('.')}}}", ""]
+        child += [_paragraph(rng, macros, sentences, s) for _ in range(paragraphs)]
+        if depth < input_depth:
+            child += [f"\\input{{sections/sec{s}-{depth + 1}}}", ""]
+        _write(project_dir, f"sections/sec{s}-{depth}", "\n".join(child))
+    return "\n".join(lines)
+
+
+def _paragraph(rng, macros, sentences, s) -> str:
+    out = []
+    for _ in range(sentences):
+        sentence = _sentence(rng, macros)
+        roll = rng.random()
+        if roll < 0.2:
+            sentence = sentence[:-1] + f" with $x_{{{rng.randint(1, 9)}}} \\in \\mathbb{{R}}^{{d}}$."
+        elif roll < 0.35:
+            sentence = sentence[:-1] + f"~\\cite{{ref{rng.randint(1, 50)}}}."
+        elif roll < 0.45:
+            sentence = sentence[:-1] + f", see Section~\\ref{{sec:{rng.randint(1, s)}}}."
+        out.append(sentence)
+    return " ".join(out) + "\n"
+
+
+def _sentence(rng, macros, n: int = 0) -> str:
+    n = n or rng.randint(8, 20)
+    words = [rng.choice(WORDS) for _ in range(n)]
+    if macros and rng.random() < 0.3:
+        macro = rng.choice(macros)
+        words.insert(rng.randrange(len(words)), f"{macro}{{x}}" if macros.index(macro) % 2 else f"{macro}{{}}")
+    words[0] = words[0].capitalize()
+    return " ".join(words) + "."
+
+
+def _letters(i: int) -> str:
+    # LaTeX macro names cannot contain digits
+    name = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        name = chr(ord("a") + r) + name
+    return name
+
+
+def _write(project_dir: str, name: str, text: str) -> None:
+    path = os.path.join(project_dir, f"{name}.tex")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic LaTeX project.")
+    parser.add_argument("project_dir", type=str)
+    parser.add_argument("--sections", type=int, default=10)
+    parser.add_argument("--subsections", type=int, default=2)
+    parser.add_argument("--paragraphs", type=int, default=3)
+    parser.add_argument("--figures", type=int, default=1)
+    parser.add_argument("--tables", type=int, default=1)
+    parser.add_argument("--equations", type=int, default=1)
+    parser.add_argument("--newcommands", type=int, default=10)
+    parser.add_argument("--input-depth", type=int, default=1)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main_path = generate_project(args.project_dir,
+                                 sections=args.sections,
+                                 subsections=args.subsections,
+                                 paragraphs=args.paragraphs,
+                                 figures=args.figures,
+                                 tables=args.tables,
+                                 equations=args.equations,
+                                 newcommands=args.newcommands,
+                                 input_depth=args.input_depth,
+                                 scale=args.scale,
+                                 seed=args.seed)
+    print(f"✅ Generated {main_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Micro-benchmarks of the parser, validator and reconstructor hot functions, with scaling curves.
+
+Each case is timed pytest-benchmark style (repeated rounds, min/mean/median/stddev) on documents built
+from the projects already in outputs/ and from the synthetic corpus (benchmarks.corpus), at 1x, 10x and
+100x input. Real documents are scaled by repeating their body, synthetic ones by generating a larger
+corpus. For every case and input the report gives the growth exponent of median time against input size
+(~1 linear, ~2 quadratic) and flags superlinear cases, so quadratic behaviour shows up before it reaches
+production batches.
+
+Cases:
+    remove_comments                       utils.remove_comments on the merged document
+    command_pattern_search                get_command_pattern (sections and captions) finditer
+    split_to_sections                     LatexParser._split_to_sections
+    extract_command_counts                ValidatorAgent.extract_command_counts
+    find_brackets_errors                  ValidatorAgent._find_brackets_errors
+    revert_inputs                         LatexConstructor._revert_inputs
+
+Usage (from the repository root):
+    python -m benchmarks.micro --scales 1 10 100 --output micro.json
+    python -m benchmarks.micro --cases split_to_sections revert_inputs --no-synthetic
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+base_dir = os.getcwd()
+sys.path.append(base_dir)
+
+from benchmarks.corpus import generate_project
+from src.agents.tool_agents.validator_agent import ValidatorAgent
+from src.formats.latex.parser import LatexParser
+from src.formats.latex.reconstruct import LatexConstructor
+from src.formats.latex.utils import find_main_tex_file, get_command_pattern, get_profect_dirs, read_tex_file, remove_comments
+
+
+class Source:
+    """
+    A benchmark input: a LaTeX project merged into one document (inputs replaced by placeholders).
+    """
+
+    def __init__(self, name: str, project_dir: str, synthetic: bool = False):
+        self.name = name
+        self.project_dir = project_dir
+        self.synthetic = synthetic
+        parser = LatexParser(project_dir, output_dir="")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.tex = parser._merge_inputs(read_tex_file(find_main_tex_file(project_dir)))
+        self.inputs = parser.inputs_json
+
+
+def measure(function: Callable[..., Any],
+            setup: Callable[[], Tuple],
+            min_rounds: int = 3,
+            max_rounds: int = 200,
+            min_time: float = 0.5) -> Dict[str, Any]:
+    """
+    Time function(*setup()) over repeated rounds; setup runs untimed before every round.
+    """
+    times = []
+    while len(times) < max_rounds and (len(times) < min_rounds or sum(times) < min_time):
+        args = setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function(*args)
+            times.append(time.perf_counter() - start)
+    return {
+        "rounds": len(times),
+        "min": min(times),
+        "mean": statistics.fmean(times),
+        "median": statistics.median(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def growth_exponent(points: List[Tuple[int, float]]) -> Optional[float]:
+    """
+    Least-squares slope of log(time) against log(input size).
+    """
+    points = [(size, seconds) for size, seconds in points if size > 0 and seconds > 0]
+    if len(points) < 2:
+        return None
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(seconds) for _, seconds in points]
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+
+
+class MicroBenchmarks:
+    def __init__(self, work_dir: str, min_time: float = 0.5, min_rounds: int = 3, max_case_seconds: float = 60.0):
+        self.work_dir = work_dir
+        self.min_time = min_time
+        self.min_rounds = min_rounds
+        self.max_case_seconds = max_case_seconds
+        self.validator = ValidatorAgent({}, project_dir="", output_dir="")
+        self.section_pattern = get_command_pattern(r'section|subsection|subsubsection|section\*|subsection\*|subsubsection\*|chapter|chapter\*')
+        self.caption_pattern = get_command_pattern(r'caption|caption\*|subcaption|subcaption\*|title|keywords|abstract|icmltitle|icmltitlerunning')
+        self.cases = {
+            "remove_comments": self.case_remove_comments,
+            "command_pattern_search": self.case_command_pattern_search,
+            "split_to_sections": self.case_split_to_sections,
+            "extract_command_counts": self.case_extract_command_counts,
+            "find_brackets_errors": self.case_find_brackets_errors,
+            "revert_inputs": self.case_revert_inputs,
+        }
+
+    def case_remove_comments(self, tex: str, inputs: List[Dict[str, Any]]):
+        return remove_comments, lambda: (tex,)
+
+    def case_command_pattern_search(self, tex: str, inputs: List[Dict[str, Any]]):
+        def search(tex):
+            return sum(1 for _ in self.section_pattern.finditer(tex)) + sum(1 for _ in self.caption_pattern.finditer(tex))
+        return search, lambda: (tex,)
+
+    def case_split_to_sections(self, tex: str, inputs: List[Dict[str, Any]]):
+        return (lambda parser, tex: parser._split_to_sections(tex)), lambda: (LatexParser("", ""), tex)
+
+    def case_extract_command_counts(self, tex: str, inputs: List[Dict[str, Any]]):
+        return self.validator.extract_command_counts, lambda: (tex,)
+
+    def case_find_brackets_errors(self, tex: str, inputs: List[Dict[str, Any]]):
+        return self.validator._find_brackets_errors, lambda: (tex,)
+
+    def case_revert_inputs(self, tex: str, inputs: List[Dict[str, Any]]):
+        output_dir = tempfile.mkdtemp(dir=self.work_dir)
+        for input_info in inputs:
+            os.makedirs(os.path.dirname(os.path.join(output_dir, input_info["path"])), exist_ok=True)
+        with open(os.path.join(output_dir, "main.tex"), "w", encoding="utf-8") as f:
+            f.write("\\documentclass{article}\n")
+        constructor = LatexConstructor(sections=[], captions=[], envs=[], inputs=inputs, newcommands=[],
+                                       output_latex_dir=output_dir)
+        return constructor._revert_inputs, lambda: (tex,)
+
+    def scaled(self, source: Source, scale: int) -> Tuple[str, List[Dict[str, Any]]]:
+        if scale == 1:
+            return source.tex, source.inputs
+        if source.synthetic:
+            project_dir = os.path.join(self.work_dir, f"{source.name}-x{scale}")
+            if not os.path.exists(project_dir):
+                generate_project(project_dir, scale=scale)
+            scaled = Source(source.name, project_dir, synthetic=True)
+            return scaled.tex, scaled.inputs
+        # repeat the body only: a document with a single preamble, as a longer paper would be
+        begin = source.tex.find("\\begin{document}")
+        end = source.tex.rfind("\\end{document}")
+        if begin == -1 or end < begin:
+            return "\n".join([source.tex] * scale), source.inputs
+        begin += len("\\begin{document}")
+        return source.tex[:begin] + source.tex[begin:end] * scale + source.tex[end:], source.inputs
+
+    def run(self, sources: List[Source], scales: List[int], case_names: List[str]) -> List[Dict[str, Any]]:
+        results = []
+        for case_name in case_names:
+            for source in sources:
+                points = []
+                curve = []
+                for scale in scales:
+                    tex, inputs = self.scaled(source, scale)
+                    if points:
+                        # skip scales that would exceed the time budget at the growth seen so far
+                        last_size, last_seconds = points[-1]
+                        exponent = max(1.0, growth_exponent(points) or 1.0)
+                        predicted = last_seconds * (len(tex) / last_size) ** exponent
+                        if predicted * self.min_rounds > self.max_case_seconds:
+                            curve.append({"scale": scale, "input_chars": len(tex), "skipped": "over time budget"})
+                            continue
+                    function, setup = self.cases[case_name](tex, inputs)
+                    stats = measure(function, setup, min_rounds=self.min_rounds, min_time=self.min_time)
+                    points.append((len(tex), stats["median"]))
+                    curve.append({"scale": scale, "input_chars": len(tex), **stats})
+                exponent = growth_exponent(points)
+                results.append({
+                    "case": case_name,
+                    "source": source.name,
+                    "curve": curve,
+                    "growth_exponent": round(exponent, 2) if exponent is not None else None,
+                    "superlinear": exponent is not None and exponent > 1.3,
+                })
+                print(self._summary(results[-1]), file=sys.stderr)
+        return results
+
+    def _summary(self, result: Dict[str, Any]) -> str:
+        times = " ".join(f"x{point['scale']}={point['median'] * 1000:.2f}ms" if "median" in point else f"x{point['scale']}=skipped"
+                         for point in result["curve"])
+        flag = " ⚠️ superlinear" if result["superlinear"] else ""
+        return f"{result['case']:<24} {result['source']:<28} {times} exponent={result['growth_exponent']}{flag}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks with scaling curves for LaTeXTrans hot functions.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--cases", type=str, nargs="+", default=None, help="Cases to run (default: all).")
+    parser.add_argument("--sources", type=str, default="outputs", help="Directory of real projects, as in outputs/.")
+    parser.add_argument("--no-real", action="store_true", help="Skip the real projects.")
+    parser.add_argument("--no-synthetic", action="store_true", help="Skip the synthetic corpus.")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum timed seconds per measurement.")
+    parser.add_argument("--min-rounds", type=int, default=3, help="Minimum rounds per measurement.")
+    parser.add_argument("--max-case-seconds", type=float, default=60.0,
+                        help="Skip a scale whose measurement (min-rounds rounds) is predicted to exceed this.")
+    parser.add_argument("--output", type=str, default="", help="Also write the JSON report to this file.")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="latextrans-micro-")
+    benchmarks = MicroBenchmarks(work_dir, min_time=args.min_time, min_rounds=args.min_rounds,
+                                 max_case_seconds=args.max_case_seconds)
+    case_names = args.cases or list(benchmarks.cases)
+    unknown = [name for name in case_names if name not in benchmarks.cases]
+    if unknown:
+        raise ValueError(f"❌ Unknown cases: {unknown}, choose from {list(benchmarks.cases)}")
+
+    sources = []
+    if not args.no_real and os.path.isdir(args.sources):
+        for output_dir in sorted(get_profect_dirs(args.sources)):
+            for project_dir in sorted(get_profect_dirs(output_dir)):
+                if find_main_tex_file(project_dir):
+                    sources.append(Source(os.path.basename(project_dir), project_dir))
+    if not args.no_synthetic:
+        project_dir = os.path.join(work_dir, "synthetic")
+        generate_project(project_dir)
+        sources.append(Source("synthetic", project_dir, synthetic=True))
+
+    try:
+        results = benchmarks.run(sources, args.scales, case_names)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps({"benchmark": "micro", "scales": args.scales, "results": results}, indent=4, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Local stand-in for an OpenAI-compatible /chat/completions endpoint, for benchmarking LaTeXTrans offline.
+
+The server answers translation requests by echoing the paragraph or transforming it deterministically
+(upper-casing the prose while keeping LaTeX commands, math and placeholders intact), answers the
+ParserAgent need_trans judges with "true", and supports streaming (SSE). Latency and failures are
+injected with a seeded random generator so runs are reproducible: latency distributions, HTTP 429 with
+Retry-After, HTTP 500, over-capacity 429s, hanging requests (client timeouts), malformed placeholders and
+malformed JSON bodies.
+
+Usage:
+    python -m benchmarks.mock_llm_server --port 8000 --latency 0.5 --latency-dist lognormal --rate-429 0.05
+
+then point [llm_config] base_url to http://127.0.0.1:8000/v1/chat/completions. GET /stats returns the
+counters, POST /reset clears them.
+"""
+from typing import Any, Dict, Optional
+from collections import Counter
+import argparse
+import asyncio
+import json
+import random
+import re
+from aiohttp import web
+
+
+class MockLLMServer:
+    # LaTeX that a transform must leave alone: placeholders, commands with their arguments, inline math
+    protected_pattern = re.compile(
+        r"<PLACEHOLDER_[^>]+>"
+        r"|\\[a-zA-Z]+\*?(?:\[[^\]]*\]|\{[^{}]*\})*"
+        r"|\\."
+        r"|\$[^$]*\$"
+    )
+    placeholder_pattern = re.compile(r"<PLACEHOLDER_(?:CAP|ENV)_\d+>")
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 8000,
+                 mode: str = "transform",
+                 latency: float = 0.0,
+                 latency_dist: str = "fixed",
+                 jitter: float = 0.0,
+                 per_char_latency: float = 0.0,
+                 rate_429: float = 0.0,
+                 retry_after: Optional[float] = 1.0,
+                 rate_500: float = 0.0,
+                 rate_timeout: float = 0.0,
+                 timeout_seconds: float = 300.0,
+                 rate_malformed: float = 0.0,
+                 rate_bad_json: float = 0.0,
+                 max_concurrency: int = 0,
+                 seed: int = 0):
+        """
+        Args:
+            mode: "echo" returns the paragraph unchanged, "transform" upper-cases its prose.
+            latency: mean seconds before answering.
+            latency_dist: "fixed", "uniform" (latency +- jitter), "normal" (sd jitter),
+                          "lognormal" (sigma jitter) or "exponential".
+            per_char_latency: extra seconds per output character, to mimic generation time.
+            rate_429 / rate_500 / rate_timeout / rate_malformed / rate_bad_json: probability per request of
+                answering 429, answering 500, hanging for timeout_seconds, dropping or duplicating a
+                placeholder, or sending a body without "choices".
+            retry_after: Retry-After seconds sent with injected 429s, None to omit the header.
+            max_concurrency: answer 429 above this many requests in flight, 0 for unlimited.
+            seed: seed of the random generator behind latency and failures.
+        """
+        self.host = host
+        self.port = port
+        self.mode = mode
+        self.latency = latency
+        self.latency_dist = latency_dist
+        self.jitter = jitter
+        self.per_char_latency = per_char_latency
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.rate_500 = rate_500
+        self.rate_timeout = rate_timeout
+        self.timeout_seconds = timeout_seconds
+        self.rate_malformed = rate_malformed
+        self.rate_bad_json = rate_bad_json
+        self.max_concurrency = max_concurrency
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.stats = Counter()
+        self.inflight = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1/chat/completions"
+
+    def make_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/chat/completions", self.handle_chat)
+        app.router.add_post("/v1/chat/completions", self.handle_chat)
+        app.router.add_get("/stats", self.handle_stats)
+        app.router.add_post("/reset", self.handle_reset)
+        return app
+
+    async def start(self) -> "MockLLMServer":
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MockLLMServer":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.stats, "inflight": self.inflight})
+
+    async def handle_reset(self, request: web.Request) -> web.Response:
+        self.stats.clear()
+        self.random.seed(self.seed)
+        return web.json_response({})
+
+    async def handle_chat(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        self.stats["requests"] += 1
+        self.inflight += 1
+        try:
+            if self.max_concurrency and self.inflight > self.max_concurrency:
+                self.stats["over_capacity"] += 1
+                return self._throttled()
+            roll = self.random.random()
+            if roll < self.rate_429:
+                self.stats["injected_429"] += 1
+                return self._throttled()
+            roll -= self.rate_429
+            if roll < self.rate_500:
+                self.stats["injected_500"] += 1
+                return web.json_response({"error": {"message": "injected server error"}}, status=500)
+            roll -= self.rate_500
+            if roll < self.rate_timeout:
+                self.stats["injected_timeout"] += 1
+                await asyncio.sleep(self.timeout_seconds)
+                return web.json_response({"error": {"message": "injected timeout"}}, status=504)
+
+            content = self.answer(payload)
+            if self.random.random() < self.rate_malformed:
+                self.stats["injected_malformed"] += 1
+                content = self._break_placeholders(content)
+            await asyncio.sleep(self._sample_latency() + self.per_char_latency * len(content))
+
+            if self.random.random() < self.rate_bad_json:
+                self.stats["injected_bad_json"] += 1
+                return web.json_response({"id": "mock", "object": "chat.completion"})
+            self.stats["completed"] += 1
+            if payload.get("stream"):
+                return await self._stream(request, content)
+            return web.json_response(self._completion(payload, content))
+        finally:
+            self.inflight -= 1
+
+    def answer(self, payload: Dict[str, Any]) -> str:
+        """
+        The deterministic answer to a chat payload.
+        """
+        messages = payload.get("messages", [])
+        system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+        user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+
+        max_tokens = payload.get("max_tokens")
+        if max_tokens is not None and max_tokens <= 1000 and "true" in system.lower():
+            # ParserAgent need_trans judge, single or batched ("[k]" markers)
+            indexes = re.findall(r"^\[(\d+)\]$", user, re.MULTILINE)
+            return "\n".join(f"{k}: true" for k in indexes) if indexes else "true"
+
+        if user.startswith("[Original]:\n"):
+            # retranslation of an error part: translate the original again
+            user = user[len("[Original]:\n"):].split("\n[Translation]:\n", 1)[0]
+        elif user.startswith("[Current LaTeX Paragraph]:\n"):
+            user = user[len("[Current LaTeX Paragraph]:\n"):]
+        elif user.startswith("<en source>"):
+            return "N/A"
+        return self.transform(user)
+
+    def transform(self, text: str) -> str:
+        if self.mode == "echo":
+            return text
+        parts = []
+        last = 0
+        for match in self.protected_pattern.finditer(text):
+            parts.append(text[last:match.start()].upper())
+            parts.append(match.group())
+            last = match.end()
+        parts.append(text[last:].upper())
+        return "".join(parts)
+
+    def _completion(self, payload: Dict[str, Any], content: str) -> Dict[str, Any]:
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in payload.get("messages", []))
+        return {
+            "id": f"mock-{self.stats['requests']}",
+            "object": "chat.completion",
+            "model": payload.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_chars // 4,
+                      "completion_tokens": len(content) // 4,
+                      "total_tokens": (prompt_chars + len(content)) // 4},
+        }
+
+    async def _stream(self, request: web.Request, content: str) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        try:
+            for i in range(0, len(content), 16):
+                chunk = {"choices": [{"index": 0, "delta": {"content": content[i:i + 16]}}]}
+                await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            await response.write(b"data: [DONE]\n\n")
+        except ConnectionResetError:
+            self.stats["stream_aborted_by_client"] += 1
+        return response
+
+    def _throttled(self) -> web.Response:
+        headers = {"Retry-After": f"{self.retry_after:g}"} if self.retry_after is not None else None
+        return web.json_response({"error": {"message": "rate limited"}}, status=429, headers=headers)
+
+    def _break_placeholders(self, content: str) -> str:
+        placeholders = self.placeholder_pattern.findall(content)
+        if placeholders and self.random.random() < 0.5:
+            return content.replace(self.random.choice(placeholders), "", 1)
+        return content + " <PLACEHOLDER_ENV_999999>"
+
+    def _sample_latency(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        if self.latency_dist == "uniform":
+            return max(0.0, self.random.uniform(self.latency - self.jitter, self.latency + self.jitter))
+        if self.latency_dist == "normal":
+            return max(0.0, self.random.gauss(self.latency, self.jitter))
+        if self.latency_dist == "lognormal":
+            # median latency, spread sigma
+            return self.latency * self.random.lognormvariate(0, self.jitter)
+        if self.latency_dist == "exponential":
+            return self.random.expovariate(1 / self.latency)
+        return self.latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible LLM server for offline benchmarks.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--mode", type=str, default="transform", choices=["echo", "transform"])
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean (median for lognormal) response latency in seconds.")
+    parser.add_argument("--latency-dist", type=str, default="fixed",
+                        choices=["fixed", "uniform", "normal", "lognormal", "exponential"])
+    parser.add_argument("--jitter", type=float, default=0.0, help="Spread of the latency distribution.")
+    parser.add_argument("--per-char-latency", type=float, default=0.0, help="Extra seconds per output character.")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Probability of an injected HTTP 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s, negative to omit.")
+    parser.add_argument("--rate-500", type=float, default=0.0, help="Probability of an injected HTTP 500.")
+    parser.add_argument("--rate-timeout", type=float, default=0.0, help="Probability of a request hanging.")
+    parser.add_argument("--timeout-seconds", type=float, default=300.0, help="How long hanging requests hang.")
+    parser.add_argument("--rate-malformed", type=float, default=0.0, help="Probability of a dropped or extra placeholder.")
+    parser.add_argument("--rate-bad-json", type=float, default=0.0, help="Probability of a body without choices.")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="Answer 429 above this many requests in flight.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockLLMServer(host=args.host,
+                           port=args.port,
+                           mode=args.mode,
+                           latency=args.latency,
+                           latency_dist=args.latency_dist,
+                           jitter=args.jitter,
+                           per_char_latency=args.per_char_latency,
+                           rate_429=args.rate_429,
+                           retry_after=args.retry_after if args.retry_after >= 0 else None,
+                           rate_500=args.rate_500,
+                           rate_timeout=args.rate_timeout,
+                           timeout_seconds=args.timeout_seconds,
+                           rate_malformed=args.rate_malformed,
+                           rate_bad_json=args.rate_bad_json,
+                           max_concurrency=args.max_concurrency,
+                           seed=args.seed)
+    print(f"🤖 Mock LLM server listening on {server.url}")
+    web.run_app(server.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
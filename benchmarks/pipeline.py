@@ -0,0 +1,236 @@
+"""
+End-to-end pipeline benchmark against the mock LLM server.
+
+For each requested corpus scale the harness generates a synthetic project (benchmarks.corpus), then runs
+the LaTeXTrans stages one after another and measures each of them:
+
+    parse      ParserAgent.execute: LatexParser.parse plus the need_trans judges
+    translate  TranslatorAgent.execute (mode 0)
+    validate   ValidatorAgent.execute
+    construct  LatexConstructor.construct into a copy of the project (no PDF compilation)
+
+Every stage reports wall time and the peak RSS of the process so far; the translate stage also reports
+sections/s and source tokens/s, and the request counters of the mock server. Results are printed as JSON
+(and written to --output) so runs can be compared across releases.
+
+Usage (from the repository root):
+    python -m benchmarks.pipeline --scales 1 10 --latency 0.2 --latency-dist lognormal --jitter 0.5 --output bench.json
+"""
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import toml
+
+base_dir = os.getcwd()
+sys.path.append(base_dir)
+
+from benchmarks.corpus import generate_project
+from benchmarks.mock_llm_server import MockLLMServer
+from src.agents.llm_client import LLMClient
+from src.agents.tool_agents.parser_agent import ParserAgent
+from src.agents.tool_agents.translator_agent import TranslatorAgent
+from src.agents.tool_agents.validator_agent import ValidatorAgent
+from src.formats.latex.reconstruct import LatexConstructor
+from src.formats.latex.utils import get_token_encoder
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident set size of this process in MiB, or None if it cannot be measured here.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, KiB elsewhere
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+    return None
+
+
+class PipelineBenchmark:
+    def __init__(self, config: Dict[str, Any], work_dir: str, quiet: bool = True):
+        self.config = config
+        self.work_dir = work_dir
+        self.quiet = quiet
+
+    async def run(self, scale: int, corpus_args: Dict[str, Any], server: MockLLMServer) -> Dict[str, Any]:
+        project_dir = os.path.join(self.work_dir, f"scale{scale}", "project")
+        output_dir = os.path.join(self.work_dir, f"scale{scale}", "output")
+        shutil.rmtree(os.path.dirname(project_dir), ignore_errors=True)
+        os.makedirs(output_dir)
+        generate_project(project_dir, scale=scale, **corpus_args)
+
+        config = json.loads(json.dumps(self.config))
+        config["llm_config"]["base_url"] = server.url
+        stages = {}
+
+        async with LLMClient(config) as llm_client:
+            stages["parse"] = await self._stage(
+                ParserAgent(config, project_dir=project_dir, output_dir=output_dir, llm_client=llm_client).execute())
+            sections = self._read(output_dir, "sections_map.json")
+            captions = self._read(output_dir, "captions_map.json")
+            envs = self._read(output_dir, "envs_map.json")
+            source_tokens = self._count_tokens(sections, captions, envs)
+
+            requests_before = server.stats["requests"]
+            translator = TranslatorAgent(config, trans_mode=0, project_dir=project_dir, output_dir=output_dir,
+                                         llm_client=llm_client)
+            stages["translate"] = await self._stage(translator.execute())
+            seconds = stages["translate"]["seconds"]
+            stages["translate"].update({
+                "sections": len(sections),
+                "captions": len(captions),
+                "envs": len(envs),
+                "source_tokens": source_tokens,
+                "requests": server.stats["requests"] - requests_before,
+                "sections_per_second": round(len(sections) / seconds, 2) if seconds else None,
+                "tokens_per_second": round(source_tokens / seconds, 1) if seconds else None,
+                "failed_parts": len(translator.fail_section_nums + translator.fail_caption_phs + translator.fail_env_phs),
+            })
+
+        validator = ValidatorAgent(config, project_dir=project_dir, output_dir=output_dir)
+        stages["validate"] = await self._stage(self._to_coroutine(validator.execute))
+        stages["validate"]["errors"] = len(stages["validate"].pop("result") or [])
+
+        transed_dir = os.path.join(output_dir, "transed")
+        shutil.copytree(project_dir, transed_dir)
+        constructor = LatexConstructor(sections=self._read(output_dir, "sections_map.json"),
+                                       captions=self._read(output_dir, "captions_map.json"),
+                                       envs=self._read(output_dir, "envs_map.json"),
+                                       inputs=self._read(output_dir, "inputs_map.json"),
+                                       newcommands=self._read(output_dir, "newcommands_map.json"),
+                                       output_latex_dir=transed_dir)
+        stages["construct"] = await self._stage(self._to_coroutine(constructor.construct))
+
+        for stage in stages.values():
+            stage.pop("result", None)
+        return {
+            "scale": scale,
+            "total_seconds": round(sum(stage["seconds"] for stage in stages.values()), 4),
+            "stages": stages,
+            "mock_server": dict(server.stats),
+        }
+
+    async def _stage(self, coroutine) -> Dict[str, Any]:
+        out = io.StringIO() if self.quiet else sys.stdout
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(out):
+            result = await coroutine
+        seconds = time.perf_counter() - start
+        return {"seconds": round(seconds, 4), "peak_rss_mb": peak_rss_mb(), "result": result}
+
+    async def _to_coroutine(self, function):
+        return function()
+
+    def _read(self, output_dir: str, name: str) -> List[Dict[str, Any]]:
+        with open(Path(output_dir, name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _count_tokens(self, *maps: List[Dict[str, Any]]) -> int:
+        enc = get_token_encoder("gpt-4")
+        return sum(len(enc.encode(part["content"])) for parts in maps for part in parts)
+
+
+async def run_benchmarks(args) -> Dict[str, Any]:
+    config = toml.load(args.config)
+    config.setdefault("llm_config", {})
+    config["llm_config"].update({"model": "mock", "api_key": "mock"})
+    config.update({"target_language": "ch", "source_language": "en", "category": {}, "user_term": "",
+                   "update_term": "False", "resume": False})
+    config.setdefault("translation_cache", {})["enabled"] = args.cache
+    for item in args.set or []:
+        key, value = item.split("=", 1)
+        config["llm_config"][key] = toml.loads(f"v = {value}")["v"]
+
+    corpus_args = {"sections": args.sections, "input_depth": args.input_depth, "seed": args.seed}
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="latextrans-bench-")
+    benchmark = PipelineBenchmark(config, work_dir, quiet=not args.verbose)
+
+    runs = []
+    async with MockLLMServer(port=0,
+                             mode="transform",
+                             latency=args.latency,
+                             latency_dist=args.latency_dist,
+                             jitter=args.jitter,
+                             per_char_latency=args.per_char_latency,
+                             rate_429=args.rate_429,
+                             rate_500=args.rate_500,
+                             rate_malformed=args.rate_malformed,
+                             max_concurrency=args.max_concurrency,
+                             seed=args.seed) as server:
+        for scale in args.scales:
+            server.stats.clear()
+            runs.append(await benchmark.run(scale, corpus_args, server))
+            print(f"✅ scale {scale}: {runs[-1]['total_seconds']}s", file=sys.stderr)
+
+    if not args.work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        "benchmark": "pipeline",
+        "version": config.get("version"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": corpus_args,
+        "mock_server": {"latency": args.latency, "latency_dist": args.latency_dist, "jitter": args.jitter,
+                        "per_char_latency": args.per_char_latency, "rate_429": args.rate_429,
+                        "rate_500": args.rate_500, "rate_malformed": args.rate_malformed,
+                        "max_concurrency": args.max_concurrency},
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end LaTeXTrans pipeline benchmark against a mock LLM.")
+    parser.add_argument("--config", type=str, default="config/default.toml", help="Base config TOML file.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="Corpus sizes, as multiples of --sections.")
+    parser.add_argument("--sections", type=int, default=10, help="Sections of the 1x corpus.")
+    parser.add_argument("--input-depth", type=int, default=1, help="Levels of nested \\input per section.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock response latency in seconds.")
+    parser.add_argument("--latency-dist", type=str, default="fixed",
+                        choices=["fixed", "uniform", "normal", "lognormal", "exponential"])
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--per-char-latency", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+    parser.add_argument("--rate-malformed", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="Keep the translation cache enabled.")
+    parser.add_argument("--set", type=str, nargs="*", help="Override [llm_config] keys, e.g. --set concurrency=32 stream=true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", type=str, default="", help="Keep generated projects and outputs here.")
+    parser.add_argument("--output", type=str, default="", help="Also write the JSON report to this file.")
+    parser.add_argument("--verbose", action="store_true", help="Show the agents' output.")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmarks(args))
+    text = json.dumps(report, indent=4, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
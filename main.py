@@ -1,8 +1,10 @@
 import toml
 import argparse
+import asyncio
 import os
 import sys
 from src.agents.coordinator_agent import CoordinatorAgent
+from src.agents.pipeline_scheduler import PipelineScheduler
 from src.formats.latex.utils import get_profect_dirs, batch_download_arxiv_tex, extract_compressed_files, get_arxiv_category, extract_arxiv_ids
 from src.formats.latex.prompts import *
 import subprocess
@@ -36,6 +38,9 @@ def main():
     parser.add_argument("--save_config", type=str, default="", help="Path to save config.")
     parser.add_argument("--valid", "-v", action="store_true", help="use valid agent.")
     parser.add_argument("--filter", "-f", action="store_true", help="use filter agent.")
+    parser.add_argument("--resume", "-r", action="store_true", help="Resume interrupted projects from existing outputs.")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="Number of projects to translate concurrently.")
+    parser.add_argument("--pipeline", "-p", action="store_true", help="Pipeline the stages of many projects.")
 
 
 
@@ -73,6 +78,12 @@ def main():
         config["output_dir"] = args.output
     if args.ut:
         config["user_term"] = args.ut
+    if args.resume:
+        config["resume"] = True
+    if args.jobs:
+        config["jobs"] = args.jobs
+    if args.pipeline:
+        config.setdefault("pipeline", {})["enabled"] = True
 
     #init_prompts(config["source_language"], config["target_language"])
 
@@ -105,19 +116,39 @@ def main():
 
 
 
-    for project_dir in tqdm(projects, desc="Processing projects", unit="project"):
-
-        try:
-
-            LaTexTrans = CoordinatorAgent(
-                config=config,
-                project_dir=project_dir,
-                output_dir=output_dir
-            )
-            LaTexTrans.workflow_latextrans()
-        except Exception as e:
-            print(f"❌ Error processing project {os.path.basename(project_dir)}: {e}")
-            continue
+    failed = []
+    jobs = int(config.get("jobs", 1))
+    if config.get("pipeline", {}).get("enabled", False) and len(projects) > 1:
+        # 流水线：解析、翻译、验证、编译各阶段同时处理不同的项目
+        with tqdm(total=len(projects), desc="Processing projects", unit="project") as progress:
+            failed = asyncio.run(PipelineScheduler(config=config,
+                                                   projects=projects,
+                                                   output_dir=output_dir,
+                                                   progress=progress).run())
+    elif jobs > 1 and len(projects) > 1:
+        # 批处理：多个项目共用一个事件循环和 LLM 连接池并发执行
+        with tqdm(total=len(projects), desc="Processing projects", unit="project") as progress:
+            failed = asyncio.run(CoordinatorAgent.workflow_batch_async(config=config,
+                                                                       projects=projects,
+                                                                       output_dir=output_dir,
+                                                                       jobs=jobs,
+                                                                       progress=progress))
+    else:
+        for project_dir in tqdm(projects, desc="Processing projects", unit="project"):
+
+            try:
+
+                LaTexTrans = CoordinatorAgent(
+                    config=config,
+                    project_dir=project_dir,
+                    output_dir=output_dir
+                )
+                if not LaTexTrans.workflow_latextrans():
+                    failed.append(project_dir)
+            except Exception as e:
+                print(f"❌ Error processing project {os.path.basename(project_dir)}: {e}")
+                failed.append(project_dir)
+                continue
 
     config["paper_list"] = []
     config["category"] = {}
@@ -132,6 +163,10 @@ def main():
             f.write(toml_str)
         print(f"save config to {config_path}!")
 
+    if failed:
+        print(f"❌ {len(failed)} of {len(projects)} projects failed: {', '.join(os.path.basename(p) for p in failed)}")
+        sys.exit(1)
+
 
 
 if __name__ == "__main__":
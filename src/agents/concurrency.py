@@ -0,0 +1,222 @@
+from typing import Any, Deque, Dict, Optional, Tuple
+from collections import deque
+import asyncio
+import threading
+import time
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter for requests to the LLM endpoint, used in place of a fixed asyncio.Semaphore.
+
+    Every request holds one slot (async with limiter); freed slots go to queued requests in arrival order.
+    The number of slots grows by about one per round trip while responses are healthy and every slot is in
+    use, and is multiplied by backoff on HTTP 429/5xx, timeouts and dropped connections, at most once per
+    round trip, so a burst of throttled requests only halves it once.
+    A response is healthy when its latency stays within latency_tolerance times the best recent latency;
+    slower responses hold the limit where it is. Outcomes are reported by LLMClient for every request
+    it sends.
+
+    Configured by the [llm_config] table of the TOML config:
+
+        concurrency             initial number of concurrent requests, default 10
+        min_concurrency         lower bound, default 1
+        max_concurrency         upper bound, default 64
+        adaptive_concurrency    adjust the limit from responses, default true (false keeps it fixed)
+        concurrency_backoff     factor applied on overload, default 0.5
+        latency_tolerance       slowdown over the best recent latency still counted as healthy, default 3.0
+    """
+
+    def __init__(self,
+                 initial: int = 10,
+                 min_limit: int = 1,
+                 max_limit: int = 64,
+                 adaptive: bool = True,
+                 backoff: float = 0.5,
+                 latency_tolerance: float = 3.0):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.adaptive = adaptive
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.overloads = 0
+        self._inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._baseline: Optional[float] = None
+        self._rtt: Optional[float] = None
+        self._last_backoff = float("-inf")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AdaptiveLimiter":
+        llm_config = config.get("llm_config", {})
+        return cls(initial=int(llm_config.get("concurrency", 10)),
+                   min_limit=int(llm_config.get("min_concurrency", 1)),
+                   max_limit=int(llm_config.get("max_concurrency", 64)),
+                   adaptive=bool(llm_config.get("adaptive_concurrency", True)),
+                   backoff=float(llm_config.get("concurrency_backoff", 0.5)),
+                   latency_tolerance=float(llm_config.get("latency_tolerance", 3.0)))
+
+    @property
+    def slots(self) -> int:
+        return int(self.limit)
+
+    async def acquire(self) -> None:
+        # queued callers go first: a new caller only takes a free slot when nobody is waiting
+        if not self._waiters and self._inflight < self.slots:
+            self._inflight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter  # _wake() hands the slot over
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # woken and cancelled at the same time: pass the slot on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self._inflight -= 1
+        self._wake()
+
+    async def __aenter__(self) -> "AdaptiveLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def record_success(self, latency: float) -> None:
+        """
+        Report a request that completed without overload after latency seconds.
+        The limit only grows while it is the bottleneck, i.e. every slot is taken or callers are queued;
+        otherwise a quiet stretch would raise it to max_limit and the next burst would hit the endpoint at once.
+        """
+        self._rtt = latency if self._rtt is None else 0.8 * self._rtt + 0.2 * latency
+        # best recent latency: follows drops at once and drifts up slowly
+        self._baseline = latency if self._baseline is None else min(latency, self._baseline + 0.05 * (latency - self._baseline))
+        if not self.adaptive or latency > self.latency_tolerance * self._baseline:
+            return
+        if self._inflight < self.slots and not self._waiters:
+            return
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def record_overload(self) -> None:
+        """
+        Report a throttled request (HTTP 429/5xx, timeout or dropped connection).
+        """
+        self.overloads += 1
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        if now - self._last_backoff < (self._rtt or 0.0):
+            return
+        self._last_backoff = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+
+    def stats(self) -> str:
+        return f"concurrency {self.slots} (range {self.min_limit}-{self.max_limit}), {self.overloads} overloaded responses"
+
+    def _wake(self) -> None:
+        while self._inflight < self.slots and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._inflight += 1
+                waiter.set_result(None)
+
+
+class RateLimiter:
+    """
+    Client-side dual token bucket for the requests-per-minute and tokens-per-minute quotas of the LLM endpoint.
+
+    Each request reserves one request and its estimated prompt + completion tokens from both buckets and
+    waits until the buckets have refilled enough to cover the reservation, so throughput stays at the quota
+    instead of bursting into HTTP 429. The buckets refill continuously and hold at most burst_seconds of
+    budget. A request larger than the bucket is let through once it is full.
+
+    Limiters are shared per endpoint, model and key through shared(), so every agent and every project of a
+    run draws from the same budget.
+
+    Configured by the [llm_config] table of the TOML config:
+
+        requests_per_minute  request quota, default 0 (unlimited)
+        tokens_per_minute    token quota, default 0 (unlimited)
+    """
+
+    burst_seconds = 10.0
+
+    _shared: Dict[Tuple[Any, ...], "RateLimiter"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.waited = 0.0
+        self._lock = threading.Lock()
+        self._updated = time.monotonic()
+        self._request_level = self._capacity(requests_per_minute, 1)
+        self._token_level = self._capacity(tokens_per_minute, 1)
+
+    @classmethod
+    def shared(cls, config: Dict[str, Any]) -> "RateLimiter":
+        """
+        The limiter of the endpoint/model/key in config, created on first use.
+        """
+        llm_config = config.get("llm_config", {})
+        requests_per_minute = float(llm_config.get("requests_per_minute", 0))
+        tokens_per_minute = float(llm_config.get("tokens_per_minute", 0))
+        key = (llm_config.get("base_url"), llm_config.get("model"), llm_config.get("api_key"),
+               requests_per_minute, tokens_per_minute)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(requests_per_minute, tokens_per_minute)
+            return cls._shared[key]
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    async def acquire(self, tokens: int) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self, tokens: int) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    def reserve(self, tokens: int) -> float:
+        """
+        Take one request and tokens from the buckets, returning how long to wait before sending.
+        The buckets may go into debt, which later reservations wait out in order.
+        """
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            delay = 0.0
+            if self.requests_per_minute > 0:
+                self._request_level = min(self._capacity(self.requests_per_minute, 1),
+                                          self._request_level + elapsed * self.requests_per_minute / 60)
+                self._request_level -= 1
+                delay = max(delay, -self._request_level * 60 / self.requests_per_minute)
+            if self.tokens_per_minute > 0:
+                self._token_level = min(self._capacity(self.tokens_per_minute, tokens),
+                                        self._token_level + elapsed * self.tokens_per_minute / 60)
+                self._token_level -= tokens
+                delay = max(delay, -self._token_level * 60 / self.tokens_per_minute)
+            self.waited += delay
+            return delay
+
+    def stats(self) -> str:
+        return f"{self.requests_per_minute:g} RPM / {self.tokens_per_minute:g} TPM budget, {self.waited:.1f}s of request delay in total"
+
+    def _capacity(self, per_minute: float, minimum: float) -> float:
+        return max(per_minute * self.burst_seconds / 60, minimum)
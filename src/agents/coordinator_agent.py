@@ -1,13 +1,16 @@
 import os
 import shutil
 from typing import Any, Dict, List, Optional
+from concurrent.futures import Executor
 from pathlib import Path
 import sys
 import asyncio
+import functools
 
 base_dir = os.getcwd()
 sys.path.append(base_dir)
 
+from .llm_client import LLMClient
 from .tool_agents.base_tool_agent import BaseToolAgent
 from .tool_agents.parser_agent import ParserAgent
 from .tool_agents.translator_agent import TranslatorAgent 
@@ -26,10 +29,15 @@ class CoordinatorAgent:
     def __init__(self, 
                  config: Dict[str, Any],
                  project_dir: str = None,
-                 output_dir: Optional[str] = None
+                 output_dir: Optional[str] = None,
+                 llm_client: Optional[LLMClient] = None,
+                 offload_blocking: bool = False
                  ):
         """
         Initializes the CoordinatorAgent.
+        If no llm_client is given, each run creates its own pooled client and closes it when done.
+        With offload_blocking, the blocking steps (parsing, validation, generation) run in worker threads so the
+        event loop stays free for the other projects of a batch.
         """
         self.config = config
         self.name = config.get("sys_name", "LaTeXTrans")
@@ -39,54 +47,152 @@ class CoordinatorAgent:
         self.output_dir = output_dir  # Output directory for parsed files
         self.loop = asyncio.new_event_loop()  # 添加事件循环
         self.mode = config.get("mode", 0)
+        self.resume = config.get("resume", False)
+        self.llm_client = llm_client
+        self.offload_blocking = offload_blocking
+        self.translator_agent: Optional[TranslatorAgent] = None
 
     def run_async(self, coro):
         """在已有事件循环中运行异步协程"""
         return self.loop.run_until_complete(coro)
 
-    async def workflow_latextrans_async(self) -> None:
+    async def _run_blocking(self, function, *args, executor: Optional[Executor] = None):
+        """
+        Run a blocking step in executor if given, else in a worker thread when offload_blocking is set.
+        """
+        if executor is None and not self.offload_blocking:
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(function, *args))
+
+    @classmethod
+    async def workflow_batch_async(cls,
+                                   config: Dict[str, Any],
+                                   projects: List[str],
+                                   output_dir: str,
+                                   jobs: int = 1,
+                                   progress: Any = None) -> List[str]:
+        """
+        Translate several projects concurrently on the running event loop, at most jobs of them at a time.
+        All projects share one LLMClient, so its limiter caps the LLM requests of the whole batch
+        (max_concurrency in [llm_config]), while one paper's translation overlaps another's parsing and compiling.
+        progress (e.g. a tqdm bar) is updated as projects finish. Returns the projects that failed.
+        """
+        sem = asyncio.Semaphore(max(1, jobs))
+        failed = []
+
+        async with LLMClient(config) as llm_client:
+            async def run(project_dir):
+                async with sem:
+                    coordinator = cls(config=config,
+                                      project_dir=project_dir,
+                                      output_dir=output_dir,
+                                      llm_client=llm_client,
+                                      offload_blocking=True)
+                    try:
+                        if not await coordinator.workflow_latextrans_async():
+                            failed.append(project_dir)
+                    except Exception as e:
+                        print(f"❌ Error processing project {os.path.basename(project_dir)}: {e}")
+                        failed.append(project_dir)
+                    finally:
+                        coordinator.loop.close()  # 批处理共用当前事件循环
+                        if progress is not None:
+                            progress.update(1)
+
+            await asyncio.gather(*(run(project_dir) for project_dir in projects))
+
+        print(f"🤖 {config.get('sys_name', 'LaTeXTrans')}: LLM requests of the batch: {llm_client.limiter.stats()}.")
+        return failed
+
+    async def workflow_latextrans_async(self) -> bool:
         """
         initializes the tool agent based on the provided agent name key.
+        Returns whether the translated PDF was generated.
         """
+        if self.llm_client is not None:
+            return await self._workflow_latextrans_async(self.llm_client)
+
+        # 本次运行内所有 agent 共用同一个连接池
+        async with LLMClient(self.config) as llm_client:
+            return await self._workflow_latextrans_async(llm_client)
+
+    async def _workflow_latextrans_async(self, llm_client: LLMClient) -> bool:
+        await self.parse_async(llm_client)
+        await self.translate_async(llm_client)
+        await self.validate_async()
+        return await self.generate_async()
+
+    # 以下各阶段既供串行工作流使用，也供 PipelineScheduler 按阶段调度
+    @property
+    def transed_project_dir(self) -> str:
+        return os.path.join(self.output_dir, f"{self.target_language}_{os.path.basename(self.project_dir)}")
+
+    async def parse_async(self, llm_client: LLMClient, executor: Optional[Executor] = None) -> bool:
         base_name = os.path.basename(self.project_dir)
-        transed_project_dir = os.path.join(self.output_dir, f"{self.target_language}_{base_name}")
+        transed_project_dir = self.transed_project_dir
 
         os.makedirs(transed_project_dir, exist_ok=True)
 
-        parser_agent = ParserAgent(config=self.config,
-                                   project_dir=self.project_dir,
-                                   output_dir=transed_project_dir)
-        parser_agent.execute()  # 假设ParserAgent仍然是同步的
+        map_files = ["sections_map.json", "captions_map.json", "envs_map.json", "inputs_map.json", "newcommands_map.json"]
+        if self.resume and all(os.path.exists(os.path.join(transed_project_dir, name)) for name in map_files):
+            # 续跑：复用已解析的 map，只翻译未完成的部分
+            print(f"🤖🔁 {self.name}: Resuming {base_name} from the parsed maps in {transed_project_dir}.")
+        else:
+            parser_agent = ParserAgent(config=self.config,
+                                       project_dir=self.project_dir,
+                                       output_dir=transed_project_dir,
+                                       llm_client=llm_client,
+                                       offload_blocking=self.offload_blocking)
+            await parser_agent.execute(executor)  # 与翻译共用同一事件循环
+        return True
+
+    async def translate_async(self, llm_client: LLMClient) -> bool:
+        self.translator_agent = TranslatorAgent(config=self.config,
+                                                project_dir=self.project_dir,
+                                                output_dir=self.transed_project_dir,
+                                                trans_mode=self.mode,
+                                                llm_client=llm_client)
+        try:
+            await self.translator_agent.execute()  # 异步调用
+        except Exception:
+            self.translator_agent.close()
+            raise
+        return True
 
-        translator_agent = TranslatorAgent(config=self.config,
-                                           project_dir=self.project_dir,
-                                           output_dir=transed_project_dir,
-                                           trans_mode=self.mode)
-        await translator_agent.execute()  # 异步调用
+    async def validate_async(self, executor: Optional[Executor] = None) -> bool:
+        translator_agent = self.translator_agent
         validator_agent = ValidatorAgent(config=self.config,
                                             project_dir=self.project_dir,
-                                            output_dir=transed_project_dir)
-        errors_report = validator_agent.execute()
-        MAX_RETRIES = 3
-        retry_count = 0
-        if errors_report:
-            translator_agent.trans_mode = 1
-
-        while errors_report and retry_count < MAX_RETRIES: # 3 times
-            translator_agent.errors_report = errors_report
-            await translator_agent.execute(error_retry_count=retry_count, Maxtry=MAX_RETRIES)
-            errors_report = validator_agent.execute(errors_report)
-            retry_count += 1
+                                            output_dir=self.transed_project_dir)
+        try:
+            errors_report = await self._run_blocking(validator_agent.execute, executor=executor)
+            MAX_RETRIES = 3
+            retry_count = 0
+            if errors_report:
+                translator_agent.trans_mode = 1
 
+            while errors_report and retry_count < MAX_RETRIES: # 3 times
+                translator_agent.errors_report = errors_report
+                await translator_agent.execute(error_retry_count=retry_count, Maxtry=MAX_RETRIES)
+                errors_report = await self._run_blocking(validator_agent.execute, errors_report, executor=executor)
+                retry_count += 1
+        finally:
+            translator_agent.close()  # 纠错结束后释放翻译缓存
+        return True
+
+    async def generate_async(self, executor: Optional[Executor] = None) -> bool:
+        base_name = os.path.basename(self.project_dir)
+        transed_project_dir = self.transed_project_dir
         generator_agent = GeneratorAgent(config=self.config,
                                          project_dir=self.project_dir,
                                          output_dir=transed_project_dir)
         try:
         
-            PDF_file_path = generator_agent.execute()
+            # latexmk 以异步子进程运行，编译期间事件循环可继续翻译其他论文
+            PDF_file_path = await generator_agent.execute_async(executor, offload=self.offload_blocking)
         except Exception as e:
             print(f"🤖🚧 {self.name}: Failed to translated {os.path.basename(self.project_dir)}.{e}")
-            return
+            return False
         
         
         
@@ -94,8 +200,10 @@ class CoordinatorAgent:
             new_PDF_path = os.path.join(transed_project_dir, f"{self.target_language}_{base_name}.pdf")
             shutil.move(PDF_file_path, new_PDF_path)
             print(f"🤖🎉 {self.name}: Successfully translated {os.path.basename(self.project_dir)} to {new_PDF_path}.")
+            return True
         else:
             print(f"🤖🚧 {self.name}: Failed to translated {os.path.basename(self.project_dir)}.")
+            return False
 
     # def workflow_latextrans(self) -> None:
     #     """
@@ -109,9 +217,10 @@ class CoordinatorAgent:
     #     # 运行异步工作流
     #     self.loop.run_until_complete(self.workflow_latextrans_async())
 
-    def workflow_latextrans(self) -> None:
+    def workflow_latextrans(self) -> bool:
         """
         初始化工具代理并执行LaTeX转换工作流（带事件循环安全管理）
+        返回是否成功生成译文PDF
         """
         # ---- 安全启动机制 ----
         if hasattr(self, 'loop') and not self.loop.is_closed():
@@ -123,7 +232,7 @@ class CoordinatorAgent:
 
         try:
             # ---- 核心工作流执行 ----
-            self.loop.run_until_complete(self.workflow_latextrans_async())
+            return self.loop.run_until_complete(self.workflow_latextrans_async())
 
         finally:
             # ---- 安全关闭序列 ----
@@ -0,0 +1,306 @@
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import json
+import threading
+import time
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from src.agents.concurrency import AdaptiveLimiter, RateLimiter
+from src.agents.retry_policy import RetryPolicy, RetryableError
+from src.formats.latex.utils import get_token_encoder
+
+
+class LLMClient:
+    """
+    Pooled HTTP client shared by every agent for calls to the LLM endpoint.
+
+    One instance is created per CoordinatorAgent run and injected into the tool agents, so all
+    requests reuse the same keep-alive connections instead of paying TCP/TLS setup per call.
+    Connection pool settings are read from the [llm_config] table of the TOML config:
+
+        max_connections           total open connections (0 means unlimited), default 100
+        max_connections_per_host  open connections per host (0 means unlimited), default 0
+        dns_cache_ttl             seconds to cache DNS lookups, default 300
+        keepalive_timeout         seconds to keep idle connections open, default 30
+
+    The client also owns the AdaptiveLimiter that caps concurrent requests, and feeds it the status and
+    latency of every request sent through the aiohttp session. Callers pass each payload to throttle()
+    (or throttle_sync()) before sending it, to stay within the RPM/TPM budget of the shared RateLimiter.
+    complete() and complete_sync() send a chat payload with throttling and the RetryPolicy applied.
+
+        stream                    stream responses (SSE) so complete() can check them as they arrive, default false
+    """
+
+    # statuses that mean the endpoint is overloaded rather than the request being wrong
+    overload_statuses = {429, 500, 502, 503, 504}
+
+    def __init__(self, config: Dict[str, Any]):
+        llm_config = config.get("llm_config", {})
+        self.model = llm_config.get("model", "gpt-4o")
+        self.base_url = llm_config.get("base_url", None)
+        self.API_KEY = llm_config.get("api_key", None)
+        self.max_connections = int(llm_config.get("max_connections", 100))
+        self.max_connections_per_host = int(llm_config.get("max_connections_per_host", 0))
+        self.dns_cache_ttl = int(llm_config.get("dns_cache_ttl", 300))
+        self.keepalive_timeout = float(llm_config.get("keepalive_timeout", 30))
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_closer = None
+        self._sync_session: Optional[requests.Session] = None
+        self.limiter = AdaptiveLimiter.from_config(config)
+        self.rate_limiter = RateLimiter.shared(config)
+        self.retry_policy = RetryPolicy.from_config(config)
+        self.stream = bool(llm_config.get("stream", False))
+        self.stream_aborts = 0
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.API_KEY}",
+            "Content-Type": "application/json"
+        }
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The pooled aiohttp session, created on first use inside the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is not loop:
+            self._discard_session()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                             limit_per_host=self.max_connections_per_host,
+                                             ttl_dns_cache=self.dns_cache_ttl,
+                                             keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                  trace_configs=[self._limiter_trace_config()])
+            self._session_loop = loop
+            # asyncio.run 结束前关闭会话，避免跨循环泄漏连接
+            self._session_closer = self._close_with_loop(self._session)
+            loop.create_task(self._session_closer.__anext__())
+        return self._session
+
+    def _discard_session(self) -> None:
+        """
+        Close the session of a previous event loop before it is replaced.
+        A session can only be closed on its own loop: a loop that has stopped is run briefly in a helper thread
+        to close it, a closed loop can no longer run, so its session is detached from the connector.
+        """
+        session, old_loop = self._session, self._session_loop
+        self._session = None
+        self._session_loop = None
+        if old_loop is not None and not old_loop.is_closed() and not old_loop.is_running():
+            closer = threading.Thread(target=old_loop.run_until_complete, args=(session.close(),))
+            closer.start()
+            closer.join()
+        else:
+            connector = session.connector
+            session.detach()
+            if connector is not None and not connector.closed:
+                try:
+                    connector.close()
+                except RuntimeError:  # event loop is closed
+                    pass
+        self._finish_closer()
+
+    def _finish_closer(self) -> None:
+        """
+        Finish the _close_with_loop generator of a session that is already closed, so it is not finalized on its old loop.
+        """
+        closer, self._session_closer = self._session_closer, None
+        if closer is None:
+            return
+        try:
+            closer.aclose().send(None)
+        except (StopIteration, RuntimeError):
+            pass
+
+    async def _close_with_loop(self, session: aiohttp.ClientSession):
+        """
+        Async generator that closes session when its loop shuts down (loop.shutdown_asyncgens, e.g. in asyncio.run).
+        """
+        try:
+            yield
+        finally:
+            if not session.closed:
+                await session.close()
+
+    @property
+    def sync_session(self) -> requests.Session:
+        """
+        The pooled requests session for the remaining blocking callers.
+        """
+        if self._sync_session is None:
+            pool_size = self.max_connections or 100
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self._sync_session = requests.Session()
+            self._sync_session.mount("http://", adapter)
+            self._sync_session.mount("https://", adapter)
+            self._sync_session.headers.update(self.headers)
+        return self._sync_session
+
+    def estimate_tokens(self, payload: Dict[str, Any]) -> int:
+        """
+        Estimated prompt + completion tokens of a chat payload.
+        The completion is bounded by max_tokens when set, otherwise assumed as long as the user message (a translation).
+        """
+        enc = get_token_encoder("gpt-4")
+        messages = payload.get("messages", [])
+        prompt_tokens = sum(len(enc.encode(str(message.get("content", "")))) + 4 for message in messages)
+        if "max_tokens" in payload:
+            completion_tokens = int(payload["max_tokens"])
+        else:
+            completion_tokens = sum(len(enc.encode(str(message.get("content", ""))))
+                                    for message in messages if message.get("role") == "user")
+        return prompt_tokens + completion_tokens
+
+    async def throttle(self, payload: Dict[str, Any]) -> None:
+        """
+        Wait until the RPM/TPM budget allows sending payload.
+        """
+        if self.rate_limiter.enabled:
+            await self.rate_limiter.acquire(self.estimate_tokens(payload))
+
+    def throttle_sync(self, payload: Dict[str, Any]) -> None:
+        """
+        Blocking throttle() for the requests session.
+        """
+        if self.rate_limiter.enabled:
+            self.rate_limiter.acquire_sync(self.estimate_tokens(payload))
+
+    async def complete(self,
+                       payload: Dict[str, Any],
+                       session: Optional[aiohttp.ClientSession] = None,
+                       name: str = "request",
+                       timeout: float = 100,
+                       make_checker: Optional[Callable[[], Any]] = None) -> str:
+        """
+        Send a chat completion payload and return the stripped message content.
+        Every attempt is throttled; failures are retried by the retry policy and the last error is raised.
+        In streaming mode, make_checker builds an object whose feed(chunk) returns an error message once the
+        output has gone wrong; the attempt is then aborted and retried without waiting for the rest.
+        """
+        session = session if session is not None else self.session
+
+        async def request() -> str:
+            await self.throttle(payload)
+            if self.stream and make_checker is not None:
+                return await self._stream(session, payload, make_checker(), timeout)
+            async with session.post(self.base_url, json=payload, headers=self.headers, timeout=timeout) as response:
+                response.raise_for_status()
+                result = await response.json()
+            return self._message_content(result)
+
+        return await self.retry_policy.run(request, name=name)
+
+    async def _stream(self, session: aiohttp.ClientSession, payload: Dict[str, Any], checker: Any, timeout: float) -> str:
+        """
+        One streamed attempt: read the SSE chunks, feeding each to the checker.
+        """
+        chunks = []
+        async with session.post(self.base_url, json={**payload, "stream": True}, headers=self.headers,
+                                timeout=timeout) as response:
+            response.raise_for_status()
+            if "text/event-stream" not in response.headers.get("Content-Type", ""):
+                # endpoint ignored stream: true
+                result = await response.json()
+                return self._message_content(result)
+            async for line in response.content:
+                line = line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = self._delta_content(json.loads(data))
+                if not chunk:
+                    continue
+                chunks.append(chunk)
+                error = checker.feed(chunk)
+                if error:
+                    # leaving the response unread closes the connection, which stops the generation
+                    self.stream_aborts += 1
+                    raise RetryableError(f"stream aborted: {error}")
+        return "".join(chunks).strip()
+
+    def complete_sync(self, payload: Dict[str, Any], name: str = "request", timeout: float = 100) -> str:
+        """
+        Blocking complete() through the requests session.
+        """
+        def request() -> str:
+            self.throttle_sync(payload)
+            response = self.sync_session.post(self.base_url, json=payload, headers=self.headers, timeout=timeout)
+            response.raise_for_status()
+            result = response.json()
+            return self._message_content(result)
+
+        return self.retry_policy.run_sync(request, name=name)
+
+    @staticmethod
+    def _message_content(result: Any) -> str:
+        """
+        Stripped message content of a chat completion response, RetryableError if the response has another shape.
+        """
+        try:
+            return result["choices"][0]["message"]["content"].strip()
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            raise RetryableError(f"malformed response: {str(result)[:200]}") from e
+
+    @staticmethod
+    def _delta_content(event: Any) -> str:
+        """
+        Content of one streamed chunk (empty for role or finish events), RetryableError if it has another shape.
+        """
+        try:
+            choices = event.get("choices") or [{}]
+            return (choices[0].get("delta") or {}).get("content") or ""
+        except (IndexError, TypeError, AttributeError) as e:
+            raise RetryableError(f"malformed stream chunk: {str(event)[:200]}") from e
+
+    def _limiter_trace_config(self) -> aiohttp.TraceConfig:
+        """
+        Report the outcome of each request to the limiter.
+        """
+        async def on_request_start(session, ctx, params):
+            ctx.start = time.monotonic()
+
+        async def on_request_end(session, ctx, params):
+            if params.response.status in self.overload_statuses:
+                self.limiter.record_overload()
+            else:
+                self.limiter.record_success(time.monotonic() - ctx.start)
+
+        async def on_request_exception(session, ctx, params):
+            if isinstance(params.exception, (asyncio.TimeoutError, aiohttp.ServerDisconnectedError,
+                                             aiohttp.ClientConnectionError)):
+                self.limiter.record_overload()
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        return trace_config
+
+    async def close(self) -> None:
+        """
+        Close the pooled sessions and release their connections.
+        """
+        if self._session is not None and not self._session.closed:
+            if self._session_loop is asyncio.get_running_loop():
+                await self._session.close()
+            else:
+                self._discard_session()
+        self._session = None
+        self._session_loop = None
+        self._finish_closer()
+        if self._sync_session is not None:
+            self._sync_session.close()
+            self._sync_session = None
+
+    async def __aenter__(self) -> "LLMClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
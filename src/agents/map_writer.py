@@ -0,0 +1,62 @@
+from typing import Any, Callable, Dict
+from pathlib import Path
+import time
+
+
+class MapWriter:
+    """
+    Write-behind persistence of the sections/captions/envs maps during translation.
+
+    Rewriting every map after each finished section costs O(sections x map size) disk I/O. Instead the
+    translator marks the maps it changed as dirty and the writer coalesces them, writing each dirty map
+    once when flush_interval seconds have passed or flush_every updates are pending, and always on the
+    final flush. Files are written through BaseToolAgent.save_file, which replaces them atomically, so an
+    interrupted run leaves the last flushed maps intact for --resume and loses at most one window of work.
+
+    Configured by optional top-level keys of the TOML config:
+
+        map_flush_interval  seconds between flushes, default 5
+        map_flush_every     pending updates that force a flush, default 20
+    """
+
+    def __init__(self,
+                 save_file: Callable[[str, str, Any], None],
+                 output_dir: str,
+                 flush_interval: float = 5.0,
+                 flush_every: int = 20):
+        self.save_file = save_file
+        self.output_dir = output_dir
+        self.flush_interval = flush_interval
+        self.flush_every = max(1, flush_every)
+        self.flushes = 0
+        self._dirty: Dict[str, Any] = {}
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], save_file: Callable[[str, str, Any], None], output_dir: str) -> "MapWriter":
+        return cls(save_file=save_file,
+                   output_dir=output_dir,
+                   flush_interval=float(config.get("map_flush_interval", 5.0)),
+                   flush_every=int(config.get("map_flush_every", 20)))
+
+    def mark_dirty(self, **maps: Any) -> None:
+        """
+        Record changed maps by file stem, e.g. mark_dirty(sections_map=sections), and flush if a threshold is hit.
+        """
+        self._dirty.update(maps)
+        self._pending += 1
+        if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write every dirty map now.
+        """
+        for name, data in self._dirty.items():
+            self.save_file(Path(self.output_dir, f"{name}.json"), "json", data)
+        if self._dirty:
+            self.flushes += 1
+        self._dirty.clear()
+        self._pending = 0
+        self._last_flush = time.monotonic()
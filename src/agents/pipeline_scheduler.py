@@ -0,0 +1,136 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
+import os
+import time
+
+from src.agents.coordinator_agent import CoordinatorAgent
+from src.agents.llm_client import LLMClient
+
+
+class PipelineScheduler:
+    """
+    Pipelined batch scheduler for many projects.
+
+    The stages of CoordinatorAgent (parse -> translate -> validate -> compile) each run as a pool of workers
+    connected by bounded queues, so at steady state every stage is busy on a different paper and the
+    throughput of the batch is limited by the slowest stage rather than by the sum of all stages.
+    Parsing, validation and the reconstruction of the translated project run in a process pool (spawned, as
+    the process already runs threads when its workers start), and latexmk runs as asyncio subprocesses capped
+    by [compile] max_latexmk (see LaTexCompiler); translation (and the re-translation of validation errors)
+    stays on the event loop, sharing one LLMClient whose limiter caps the LLM requests of the whole batch.
+
+    Configured by the [pipeline] table of the TOML config:
+
+        parse_workers      papers parsed at once, default half the CPU cores
+        translate_workers  papers translated at once, default 4
+        validate_workers   papers validated at once, default half the CPU cores
+        compile_workers    papers compiled at once, default half the CPU cores
+        queue_size         papers waiting between two stages, default 2
+        process_workers    size of the process pool, default the CPU cores
+    """
+
+    stages = ["parse", "translate", "validate", "compile"]
+
+    def __init__(self,
+                 config: Dict[str, Any],
+                 projects: List[str],
+                 output_dir: str,
+                 progress: Any = None):
+        self.config = _plain(config)  # agents are sent to the process pool with their config
+        self.name = config.get("sys_name", "LaTeXTrans")
+        self.projects = projects
+        self.output_dir = output_dir
+        self.progress = progress  # e.g. a tqdm bar, updated as papers leave the pipeline
+        pipeline_config = config.get("pipeline", {})
+        cores = os.cpu_count() or 1
+        defaults = {"parse": cores // 2, "translate": 4, "validate": cores // 2, "compile": cores // 2}
+        self.workers = {stage: max(1, int(pipeline_config.get(f"{stage}_workers", defaults[stage])))
+                        for stage in self.stages}
+        self.queue_size = max(1, int(pipeline_config.get("queue_size", 2)))
+        self.process_workers = max(1, int(pipeline_config.get("process_workers", cores)))
+        self.busy = defaultdict(float)  # seconds spent by each stage, summed over its workers
+        self.failed: List[str] = []
+
+    async def run(self) -> List[str]:
+        """
+        Run every project through the pipeline. Returns the projects that failed.
+        """
+        start = time.perf_counter()
+        queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in self.stages}
+
+        # 进程池按需启动工作进程, 此时事件循环的线程池和 tqdm 线程已在运行, fork 可能继承被占用的锁而死锁, 故用 spawn
+        with ProcessPoolExecutor(max_workers=self.process_workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            async with LLMClient(self.config) as llm_client:
+                handlers = {
+                    "parse": lambda coordinator: coordinator.parse_async(llm_client, executor),
+                    "translate": lambda coordinator: coordinator.translate_async(llm_client),
+                    "validate": lambda coordinator: coordinator.validate_async(executor),
+                    "compile": lambda coordinator: coordinator.generate_async(executor),
+                }
+                await asyncio.gather(
+                    self._feed(queues["parse"], llm_client),
+                    *(self._run_stage(stage, handlers[stage], queues[stage],
+                                      queues[self.stages[k + 1]] if k + 1 < len(self.stages) else None)
+                      for k, stage in enumerate(self.stages)))
+
+        seconds = time.perf_counter() - start
+        busy = ", ".join(f"{stage} {self.busy[stage]:.1f}s/{self.workers[stage]} workers" for stage in self.stages)
+        print(f"🤖 {self.name}: Pipelined {len(self.projects)} projects in {seconds:.1f}s ({busy}), "
+              f"{len(self.failed)} failed. LLM requests: {llm_client.limiter.stats()}.")
+        return self.failed
+
+    async def _feed(self, queue: asyncio.Queue, llm_client: LLMClient) -> None:
+        for project_dir in self.projects:
+            await queue.put(CoordinatorAgent(config=self.config,
+                                             project_dir=project_dir,
+                                             output_dir=self.output_dir,
+                                             llm_client=llm_client))
+        for _ in range(self.workers["parse"]):
+            await queue.put(None)
+
+    async def _run_stage(self,
+                         stage: str,
+                         handler: Callable[[CoordinatorAgent], Awaitable[bool]],
+                         inbox: asyncio.Queue,
+                         outbox: Optional[asyncio.Queue]) -> None:
+        """
+        Run the workers of one stage until the stage before it is done, then tell the next stage.
+        """
+        async def worker():
+            while (coordinator := await inbox.get()) is not None:
+                start = time.perf_counter()
+                try:
+                    passed = await handler(coordinator)
+                except Exception as e:
+                    print(f"❌ Error processing project {os.path.basename(coordinator.project_dir)} at {stage}: {e}")
+                    passed = False
+                self.busy[stage] += time.perf_counter() - start
+                if passed and outbox is not None:
+                    await outbox.put(coordinator)
+                    continue
+                if not passed:
+                    self.failed.append(coordinator.project_dir)
+                coordinator.loop.close()  # 调度器共用当前事件循环
+                if self.progress is not None:
+                    self.progress.update(1)
+
+        await asyncio.gather(*(worker() for _ in range(self.workers[stage])))
+        if outbox is not None:
+            next_stage = self.stages[self.stages.index(stage) + 1]
+            for _ in range(self.workers[next_stage]):
+                await outbox.put(None)
+
+
+def _plain(value: Any) -> Any:
+    """
+    Copy of a config with plain dicts and lists, since toml's inline tables cannot be pickled.
+    """
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
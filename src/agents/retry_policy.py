@@ -0,0 +1,139 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from email.utils import parsedate_to_datetime
+import asyncio
+import datetime
+import json
+import random
+import time
+import aiohttp
+import requests
+
+
+T = TypeVar("T")
+
+
+class RetryableError(Exception):
+    """
+    Raised by a request that got a response worth retrying, e.g. a streamed translation aborted early
+    or a response without the expected choices/message/content fields.
+    """
+
+
+class RetryPolicy:
+    """
+    Retry policy shared by every request to the LLM endpoint.
+
+    Errors are classified before retrying: throttling (HTTP 429), server errors (5xx, 408), timeouts, dropped
+    connections, responses that are not valid JSON and RetryableError are retried; other client errors (400, 401, 403, 404, ...) are
+    raised at once since sending the same request again cannot succeed. Retries wait for the Retry-After
+    header when the endpoint sends one, and otherwise for exponential backoff with full jitter
+    (uniform between 0 and base_delay * 2^(attempt-1), capped at max_delay), so clients that failed together
+    do not retry together.
+
+    Configured by the [llm_config] table of the TOML config:
+
+        max_attempts      attempts per request including the first, default 3
+        retry_base_delay  backoff of the first retry in seconds, default 1
+        retry_max_delay   cap of the backoff in seconds, default 60
+        max_retry_after   cap of an honoured Retry-After in seconds, default 120
+    """
+
+    retry_statuses = {408, 409, 425, 429}
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay: float = 1.0,
+                 max_delay: float = 60.0,
+                 max_retry_after: float = 120.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RetryPolicy":
+        llm_config = config.get("llm_config", {})
+        return cls(max_attempts=int(llm_config.get("max_attempts", 3)),
+                   base_delay=float(llm_config.get("retry_base_delay", 1.0)),
+                   max_delay=float(llm_config.get("retry_max_delay", 60.0)),
+                   max_retry_after=float(llm_config.get("max_retry_after", 120.0)))
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, RetryableError):
+            return True
+        status = self._status(error)
+        if status is not None:
+            return status in self.retry_statuses or status >= 500 or 200 <= status < 300  # 2xx: unreadable body
+        if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError,
+                              requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        # 响应体不是合法JSON; 缺少choices等字段由调用方转为RetryableError, 其余异常视为程序错误直接抛出
+        return isinstance(error, json.JSONDecodeError)
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        Seconds to wait before retry number attempt (1 for the first retry).
+        """
+        retry_after = self._retry_after(error) if error is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def run(self, request: Callable[[], Awaitable[T]], name: str = "request") -> T:
+        """
+        Await request() until it succeeds, retrying retryable errors. The last error is raised.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await request()
+            except Exception as e:
+                if attempt == self.max_attempts or not self.is_retryable(e):
+                    raise
+                delay = self.delay(attempt, e)
+                print(f"⚠️ Attempt {attempt}/{self.max_attempts} of {name} failed: {self._describe(e)}, retrying in {delay:.1f}s.")
+                await asyncio.sleep(delay)
+
+    def run_sync(self, request: Callable[[], T], name: str = "request") -> T:
+        """
+        Blocking run() for the requests session.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return request()
+            except Exception as e:
+                if attempt == self.max_attempts or not self.is_retryable(e):
+                    raise
+                delay = self.delay(attempt, e)
+                print(f"⚠️ Attempt {attempt}/{self.max_attempts} of {name} failed: {self._describe(e)}, retrying in {delay:.1f}s.")
+                time.sleep(delay)
+
+    def _status(self, error: BaseException) -> Optional[int]:
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            return error.response.status_code
+        return None
+
+    def _retry_after(self, error: BaseException) -> Optional[float]:
+        headers = None
+        if isinstance(error, aiohttp.ClientResponseError):
+            headers = error.headers
+        elif isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            headers = error.response.headers
+        value = headers.get("Retry-After") if headers else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+        return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+    def _describe(self, error: BaseException) -> str:
+        return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
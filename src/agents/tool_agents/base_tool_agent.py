@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
+import os
+import sys
 import json
+import asyncio
 import yaml
 import toml
 from pathlib import Path
@@ -29,6 +32,7 @@ class BaseToolAgent(ABC):
         """
         self.agent_name = agent_name
         self.config = config if config is not None else {}
+        self._background_tasks = set()  # keeps _clear_later tasks alive until they finish
         
     def log(self, message: str, level: str = "info"):
         """
@@ -61,6 +65,22 @@ class BaseToolAgent(ABC):
         """
         raise NotImplementedError(f"{self.__class__.__name__}.execute() must be implemented.")
 
+    def _clear_later(self, *elements, delay: float = 3) -> None:
+        """
+        Empty streamlit elements after delay seconds without blocking the event loop,
+        so a finished status stays readable while other work goes on.
+        """
+        async def clear():
+            await asyncio.sleep(delay)
+            sys.stderr = open(os.devnull, 'w')
+            for element in elements:
+                element.empty()
+            sys.stderr = sys.__stderr__
+
+        task = asyncio.get_running_loop().create_task(clear())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     def get_config(self, key: str, default: Any = None) -> Any:
         """
         Retrieves a configuration value for the agent.
@@ -87,15 +107,20 @@ class BaseToolAgent(ABC):
     def save_file(self, file_path: str, file_format: str, data: Any):
         """
         Saves data to a file.
+        The data is written to a temporary file first and then renamed over the target,
+        so an interrupted run never leaves a truncated file behind.
         """
+        file_path = str(file_path)
+        tmp_path = f"{file_path}.tmp"
         if file_format == "json":
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=4, ensure_ascii=False)   
         elif file_format == "yaml":
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 yaml.dump(data, f)
         elif file_format == "toml":
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 toml.dump(data, f)
-
-
+        else:
+            raise ValueError(f"Unsupported file format: {file_format}")
+        os.replace(tmp_path, file_path)
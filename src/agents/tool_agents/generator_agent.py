@@ -1,9 +1,11 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from concurrent.futures import Executor
 from src.agents.tool_agents.base_tool_agent import BaseToolAgent
 from pathlib import Path
 import sys
 import os
 import shutil
+import asyncio
 
 import streamlit as st
 import time
@@ -12,6 +14,15 @@ base_dir = os.getcwd()
 sys.path.append(base_dir)
 
 
+def construct_translation(config: Dict[str, Any], project_dir: str, output_dir: str) -> str:
+    """
+    GeneratorAgent.construct() as a module level function, so that it can be sent to a process pool.
+    """
+    generator_agent = GeneratorAgent(config=config, project_dir=project_dir, output_dir=output_dir)
+    generator_agent._init_progress()
+    return generator_agent.construct()
+
+
 class GeneratorAgent(BaseToolAgent):
     def __init__(self, 
                  config: Dict[str, Any],
@@ -24,21 +35,63 @@ class GeneratorAgent(BaseToolAgent):
         self.output_dir = output_dir  # Output directory for parsed files
 
     def execute(self) -> Any:
+        self._init_progress()
+        self.log(f"🤖💬 Start generating for project...⏳: {os.path.basename(self.project_dir)}.")
+
+        transed_latex_dir = self.construct()
+
+        sys.stderr = open(os.devnull, 'w')
+        self.progress_bar.progress(80)
+        self.status_text.text("🛠️ Compiling PDF document...")
+        sys.stderr = sys.__stderr__
+
+        from src.formats.latex.compile import LaTexCompiler
+        latex_compiler = LaTexCompiler(output_latex_dir=transed_latex_dir, config=self.config)
+        pdf_file = latex_compiler.compile()
+        return self._report(pdf_file)
+
+    async def execute_async(self, executor: Optional[Executor] = None, offload: bool = False) -> Any:
+        """
+        Like execute(), but latexmk runs as an asyncio subprocess (see LaTexCompiler.compile_async) and, with an
+        executor (e.g. a process pool) or offload, the reconstruction runs off the event loop too.
+        """
+        self._init_progress()
+        self.log(f"🤖💬 Start generating for project...⏳: {os.path.basename(self.project_dir)}.")
+
+        if executor is not None or offload:
+            transed_latex_dir = await asyncio.get_running_loop().run_in_executor(
+                executor, construct_translation, self.config, self.project_dir, self.output_dir)
+        else:
+            transed_latex_dir = self.construct()
+
+        sys.stderr = open(os.devnull, 'w')
+        self.progress_bar.progress(80)
+        self.status_text.text("🛠️ Compiling PDF document...")
+        sys.stderr = sys.__stderr__
+
+        from src.formats.latex.compile import LaTexCompiler
+        latex_compiler = LaTexCompiler(output_latex_dir=transed_latex_dir, config=self.config)
+        pdf_file = await latex_compiler.compile_async()
+        # 成功提示在后台延时清除, 不阻塞事件循环
+        return self._report(pdf_file, blocking=False)
+
+    def _init_progress(self) -> None:
         sys.stderr = open(os.devnull, 'w')
         self.process_b = st.empty()
         with self.process_b:
             self.progress_bar = st.progress(0)
         self.status_text = st.empty()
         sys.stderr = sys.__stderr__
-        
-        self.log(f"🤖💬 Start generating for project...⏳: {os.path.basename(self.project_dir)}.")
 
+    def construct(self) -> str:
+        """
+        Rebuild the translated LaTeX project from the maps and return its directory.
+        """
         sys.stderr = open(os.devnull, 'w')
         self.status_text.text("🔄 Start generating for project...")
         self.progress_bar.progress(5)
         sys.stderr = sys.__stderr__
 
-        from src.formats.latex.compile import LaTexCompiler
         from src.formats.latex.reconstruct import LatexConstructor
 
         sys.stderr = open(os.devnull, 'w')
@@ -88,15 +141,13 @@ class GeneratorAgent(BaseToolAgent):
                                 output_latex_dir=transed_latex_dir
                             )
         latex_constructor.construct()
+        return transed_latex_dir
 
-        sys.stderr = open(os.devnull, 'w')
-        self.progress_bar.progress(80)
-        self.status_text.text("🛠️ Compiling PDF document...")
-        sys.stderr = sys.__stderr__
-
-        latex_compiler = LaTexCompiler(output_latex_dir=transed_latex_dir)
-        pdf_file = latex_compiler.compile()
-
+    def _report(self, pdf_file: Optional[str], linger: float = 2, blocking: bool = True) -> Optional[str]:
+        """
+        Show the outcome; the success message stays linger seconds before the progress elements are cleared.
+        Unless blocking, they are cleared by a task on the running event loop instead of sleeping.
+        """
         sys.stderr = open(os.devnull, 'w')
         self.progress_bar.progress(90)
         sys.stderr = sys.__stderr__
@@ -106,9 +157,12 @@ class GeneratorAgent(BaseToolAgent):
             self.status_text.text("✅ Successfully compiled PDF document.")
             self.progress_bar.progress(100)
             st.success(f"✅ Successfully generated for {os.path.basename(self.project_dir)}.")
-            time.sleep(2)
-            self.process_b.empty()
-            self.status_text.empty()
+            if blocking:
+                time.sleep(linger)
+                self.process_b.empty()
+                self.status_text.empty()
+            else:
+                self._clear_later(self.process_b, self.status_text, delay=linger)
             sys.stderr = sys.__stderr__
 
             self.log(f"✅ Successfully generated for {os.path.basename(self.project_dir)}.")
@@ -1,21 +1,39 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from concurrent.futures import Executor
 from src.agents.tool_agents.base_tool_agent import BaseToolAgent
+from src.agents.llm_client import LLMClient
 import src.formats.latex.prompts as pm
+from src.formats.latex.utils import get_token_encoder
 from pathlib import Path
 import sys
 import os
-import requests
-import time
+import re
+import asyncio
+import aiohttp
 from tqdm import tqdm
 
 base_dir = os.getcwd()
 sys.path.append(base_dir)
 
+def parse_project(project_dir: str, output_dir: str):
+    """
+    Parse a LaTeX project and return the LatexParser holding its maps.
+    Module level so that it can be sent to a process pool.
+    """
+    from src.formats.latex.parser import LatexParser
+    latex_parser = LatexParser(project_dir, output_dir)
+    latex_parser.parse()
+    # latex_parser.parse_no_env_cap_ph()
+    return latex_parser
+
+
 class ParserAgent(BaseToolAgent):
     def __init__(self, 
                  config: Dict[str, Any], 
                  project_dir: str = None,
-                 output_dir: str = None
+                 output_dir: str = None,
+                 llm_client: Optional[LLMClient] = None,
+                 offload_blocking: bool = False
                  ):
         super().__init__(agent_name="ParserAgent", config=config)
         self.config = config
@@ -24,15 +42,33 @@ class ParserAgent(BaseToolAgent):
         self.model = config["llm_config"].get("model", "gpt-4o")
         self.base_url = config["llm_config"].get("base_url", None)
         self.API_KEY = config["llm_config"].get("api_key", None)
+        self.llm_client = llm_client if llm_client is not None else LLMClient(config)
+        self._owns_llm_client = llm_client is None  # 自己创建的客户端由自己关闭
+        self.offload_blocking = offload_blocking  # 批处理时在线程中解析, 不阻塞其他项目的事件循环
+        self.judge_concurrency = int(config["llm_config"].get("judge_concurrency", 10))
+        self.judge_batch_size = int(config["llm_config"].get("judge_batch_size", 1))  # envs per judge request, 1 disables batching
+        self.judge_batch_tokens = int(config["llm_config"].get("judge_batch_tokens", 4000))  # token budget of one batched request
+
+    async def execute(self, executor: Optional[Executor] = None) -> Any:
+        """
+        Parse the project and judge which envs need translation. With an executor (e.g. the process pool of the
+        pipeline scheduler) or offload_blocking, the parsing itself runs off the event loop.
+        """
+        try:
+            return await self._execute(executor)
+        finally:
+            if self._owns_llm_client:
+                await self.llm_client.close()
 
-    def execute(self) -> Any:
+    async def _execute(self, executor: Optional[Executor] = None) -> Any:
         pm.init_prompts(self.config["source_language"], self.config["target_language"])
         self.log(f"🤖💬 Starting parsing for project...⏳: {os.path.basename(self.project_dir)}.")
 
-        from src.formats.latex.parser import LatexParser
-        latex_parser = LatexParser(self.project_dir, self.output_dir)
-        latex_parser.parse() 
-        # latex_parser.parse_no_env_cap_ph()
+        if executor is not None or self.offload_blocking:
+            latex_parser = await asyncio.get_running_loop().run_in_executor(executor, parse_project,
+                                                                            self.project_dir, self.output_dir)
+        else:
+            latex_parser = parse_project(self.project_dir, self.output_dir)
 
         env_need_trans = []
         if latex_parser.envs_json:
@@ -47,13 +83,44 @@ class ParserAgent(BaseToolAgent):
                         env["placeholder"]: i for i, env in enumerate(latex_parser.envs_json)
                     }
             
-            for env in tqdm(env_need_trans, desc=f"Setting need trans", total=len(env_need_trans), unit="env"):
-                i = placeholder_to_index.get(env["placeholder"])
-                if i is not None:
-                    latex_parser.envs_json[i]["need_trans"] = self._request_llm_for_judge(
-                                                                    pm.set_need_trans_for_envs_system_prompt,
-                                                                    env["content"]
-                                                                    )
+            session = self.llm_client.session
+            sem = asyncio.Semaphore(self.judge_concurrency)
+
+            # 同时占用共享限流器的名额, 批处理时判断请求也计入全局并发上限
+            async def judge_env(env):
+                async with sem, self.llm_client.limiter:
+                    need_trans = await self._request_llm_for_judge(
+                                                pm.set_need_trans_for_envs_system_prompt,
+                                                env["content"],
+                                                session=session
+                                                )
+                    return env["placeholder"], need_trans
+
+            async def judge_batch(batch):
+                if len(batch) == 1:
+                    return [await judge_env(batch[0])]
+                async with sem, self.llm_client.limiter:
+                    answers = await self._request_llm_for_judge_batch(
+                                                pm.set_need_trans_for_envs_batch_system_prompt,
+                                                [env["content"] for env in batch],
+                                                session=session
+                                                )
+                results = [(env["placeholder"], answers[k]) for k, env in enumerate(batch) if k in answers]
+                # 无法解析的条目退回逐个判断
+                missing = [env for k, env in enumerate(batch) if k not in answers]
+                results.extend(await asyncio.gather(*(judge_env(env) for env in missing)))
+                return results
+
+            batches = self._pack_judge_batches(env_need_trans)
+            tasks = [judge_batch(batch) for batch in batches]
+            with tqdm(desc=f"Setting need trans", total=len(env_need_trans), unit="env") as pbar:
+                for future in asyncio.as_completed(tasks):
+                    results = await future
+                    for placeholder, need_trans in results:
+                        i = placeholder_to_index.get(placeholder)
+                        if i is not None:
+                            latex_parser.envs_json[i]["need_trans"] = need_trans
+                    pbar.update(len(results))
 
         self.save_file(Path(self.output_dir, "inputs_map.json"), "json", latex_parser.inputs_json)
         self.save_file(Path(self.output_dir, "envs_map.json"), "json", latex_parser.envs_json)
@@ -77,7 +144,64 @@ class ParserAgent(BaseToolAgent):
     #     )
     #     return set_env
 
-    def _request_llm_for_judge(self, system_prompt: str, text: str) -> bool:
+    def _pack_judge_batches(self, envs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Group envs into judge batches of at most judge_batch_size items and judge_batch_tokens tokens.
+        """
+        if self.judge_batch_size <= 1:
+            return [[env] for env in envs]
+
+        enc = get_token_encoder("gpt-4")
+        batches = []
+        batch = []
+        batch_tokens = 0
+        for env in envs:
+            env_tokens = len(enc.encode(env["content"]))
+            if batch and (len(batch) >= self.judge_batch_size or batch_tokens + env_tokens > self.judge_batch_tokens):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(env)
+            batch_tokens += env_tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _request_llm_for_judge_batch(self, system_prompt: str, texts: List[str], session: aiohttp.ClientSession) -> Dict[int, bool]:
+        """
+        Judge several envs with one request. Returns {index in texts: need_trans} for every answer that could be parsed.
+        """
+        user_prompt = "\n".join(f"[{k + 1}]\n{text}" for k, text in enumerate(texts))
+        payload = {
+            "model": f"{self.model}",
+            "messages": [
+                {
+                    "role": "system", 
+                    "content": f"{system_prompt}"
+                },
+                {
+                    "role": "user", 
+                    "content": f"{user_prompt}"
+                }
+            ],
+            "temperature": 0,
+            "max_tokens": 10 * len(texts) + 20
+        }
+
+        try:
+            output = await self.llm_client.complete(payload, session=session, name="request to judge a batch of envs")
+        except Exception as e:
+            print(f"⚠️ Failed to Set need trans for a batch of {len(texts)} envs, judging them one by one.")
+            return {}
+
+        answers = {}
+        for match in re.finditer(r"^\W*(\d+)\W+(true|false)\b", output, re.IGNORECASE | re.MULTILINE):
+            k = int(match.group(1)) - 1
+            if 0 <= k < len(texts) and k not in answers:
+                answers[k] = match.group(2).lower() == "true"
+        return answers
+
+    async def _request_llm_for_judge(self, system_prompt: str, text: str, session: aiohttp.ClientSession) -> bool:
         """
         
         """
@@ -98,31 +222,16 @@ class ParserAgent(BaseToolAgent):
             "max_tokens": 50
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        
-        for attempt in range(1, 4):
-            try:
-                response = requests.post(self.base_url, json=payload, headers=headers, timeout=100)
-                response.raise_for_status()  
-                result = response.json()
-                output = result["choices"][0]["message"]["content"].strip()
-                # print(text,'\n', output)
-
-                if output.lower() == "true":
-                    return True
-                elif output.lower() == "false":
-                    return False
-                else:
-                    return True                
-            except requests.exceptions.RequestException as e:
-                if attempt < 3:
-                    print(f"{e}")
-                    time.sleep(3)  
-                else:
-                    print(f"⚠️ Failed to Set need trans, set True.")
-                    return True
-                
\ No newline at end of file
+        try:
+            output = await self.llm_client.complete(payload, session=session, name="request to judge an env")
+        except Exception as e:
+            print(f"⚠️ Failed to Set need trans, set True.")
+            return True
+        # print(text,'\n', output)
+
+        if output.lower() == "true":
+            return True
+        elif output.lower() == "false":
+            return False
+        else:
+            return True
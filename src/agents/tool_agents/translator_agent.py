@@ -1,5 +1,11 @@
 from typing import Dict, Any, List, Optional
 from src.agents.tool_agents.base_tool_agent import BaseToolAgent
+from src.agents.llm_client import LLMClient
+from src.agents.concurrency import AdaptiveLimiter
+from src.agents.tool_agents.validator_agent import StreamChecker, ValidatorAgent
+from src.agents.translation_cache import TranslationCache
+from src.agents.map_writer import MapWriter
+from src.formats.latex.part_index import PartIndex
 #from TransLatex.src.formats.latex.prompts import *
 import src.formats.latex.prompts as pm
 from src.formats.latex.utils import *
@@ -11,7 +17,6 @@ import regex
 import asyncio
 import aiohttp
 import requests
-import time
 import pandas as pd
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -31,6 +36,7 @@ class TranslatorAgent(BaseToolAgent):
                  project_dir: Optional[str] = None,
                  output_dir: Optional[str] = None,
                  errors_report: Optional[List[Dict]] = None,
+                 llm_client: Optional[LLMClient] = None,
                  ):
         super().__init__(agent_name="TranslatorAgent", config=config)
         self.config = config
@@ -53,14 +59,29 @@ class TranslatorAgent(BaseToolAgent):
         self.have_fail_parts = False
         self.errors_report = errors_report if errors_report is not None else []
         self.trans_mode = trans_mode if trans_mode is not None else 0
+        self.resume = config.get("resume", False)  # keep parts already translated by an interrupted run
         # self.term_dict = config.get("term_dict", {})  # Dictionary for terminology translation
         self.term_dict = {}
         self.summary = ''
         self.prev_text = ''
         self.prev_transed_text = ''
         self.currant_content = ''
+        self.llm_client = llm_client if llm_client is not None else LLMClient(config)
+        self._owns_llm_client = llm_client is None  # 自己创建的客户端由自己关闭
+        self.translation_cache = TranslationCache.from_config(config)
+        self._validator = ValidatorAgent(config, project_dir=project_dir, output_dir=output_dir)
+        self._cache_contexts: Dict[tuple, tuple] = {}  # (type, part) -> (source text, cache context) of its request
+        self.map_writer = MapWriter.from_config(config, self.save_file, output_dir)
+        self.part_index: Optional[PartIndex] = None
 
     async def execute(self, error_retry_count=0, Maxtry=3):
+        try:
+            return await self._execute(error_retry_count, Maxtry)
+        finally:
+            if self._owns_llm_client:
+                await self.llm_client.close()
+
+    async def _execute(self, error_retry_count=0, Maxtry=3):
         """
         只修改了mode0部分,其他mode无需再修改execute及其上游方法,其已经改入异步循环
         但其他mode需要修改execute内部内容及其下游方法
@@ -79,64 +100,77 @@ class TranslatorAgent(BaseToolAgent):
         sections = self.read_file(Path(self.output_dir, "sections_map.json"), "json")
         captions = self.read_file(Path(self.output_dir, "captions_map.json"), "json")
         envs = self.read_file(Path(self.output_dir, "envs_map.json"), "json")
+        self.part_index = PartIndex(sections=sections, captions=captions, envs=envs)
 
         if self.trans_mode == 0 or self.trans_mode == 2:
             self.log(f"🤖💬 Starting translating for project...⏳: {os.path.basename(self.project_dir)}.")
+            if self.resume:
+                pending_secs = [sec for sec in sections if sec["section"] not in ("-1", "0") and not self._is_resumed(sec)]
+                pending_caps = [cap for cap in captions if not self._is_resumed(cap)]
+                pending_envs = [env for env in envs if env.get("need_trans") and not self._is_resumed(env)]
+                self.log(f"🔁 Resuming: {len(pending_secs)} sections, {len(pending_caps)} captions and {len(pending_envs)} envs left to translate.")
 
             sys.stderr = open(os.devnull, 'w')
             status_text.text(f"🤖💬 Starting translating for project...⏳: {os.path.basename(self.project_dir)}.")
             process_bar.progress(5)
             sys.stderr = sys.__stderr__
 
-            async with aiohttp.ClientSession() as session:
-                sem = asyncio.Semaphore(10)  # 考虑到api响应速度,大概10s左右处理一个section,每半秒启动一次调用,10左右应该不会浪费api token
-
-                async def process_section(i, sec):
-                    async with sem:
-                        translated = await self.translate(sec, envs, captions, session)
-                        return i, translated
-
-                tasks = [process_section(i, sec) for i, sec in enumerate(sections)]
+            session = self.llm_client.session
+            sem = self.llm_client.limiter  # 自适应并发(AIMD), 见[llm_config]中的concurrency配置
 
-                completed = 0
+            async def process_section(i, sec):
+                # 不在此处占用信号量: section/env/caption 的每个请求各自排队, 避免同一section内串行等待
+                translated = await self.translate(sec, envs, captions, session, sem=sem)
+                return i, translated
 
-                for future in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Translating...",
-                                   unit="section"):
-                    i, translated_section = await future
-                    sections[i] = translated_section
-                    
-                    completed += 1
+            tasks = [process_section(i, sec) for i, sec in enumerate(sections)]
 
-                    sys.stderr = open(os.devnull, 'w')
-                    process = int(5 + 90 * completed / len(tasks))
-                    process_bar.progress(process) 
-                    sys.stderr = sys.__stderr__
+            completed = 0
 
-                    # 保存考虑修改为内存整合一次硬存读写
-                    self.save_file(Path(self.output_dir, "sections_map.json"), "json", sections)
-                    self.save_file(Path(self.output_dir, "captions_map.json"), "json", captions)
-                    self.save_file(Path(self.output_dir, "envs_map.json"), "json", envs)
+            for future in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Translating...",
+                               unit="section"):
+                i, translated_section = await future
+                sections[i] = translated_section
+                
+                completed += 1
 
                 sys.stderr = open(os.devnull, 'w')
-                status_text.text("🔍 Validating translation results ..")
-                process_bar.progress(95)
+                process = int(5 + 90 * completed / len(tasks))
+                process_bar.progress(process) 
                 sys.stderr = sys.__stderr__
 
-                await self._val_fail_parts(Maxtry=Maxtry,
-                                     sections=sections,
-                                     captions=captions,
-                                     envs=envs,
-                                     session=session)
+                # 合并写盘: 标记为脏, 按时间/数量阈值批量落盘
+                self.map_writer.mark_dirty(sections_map=sections, captions_map=captions, envs_map=envs)
 
-                self.log(f"✅ Successfully translated sections!")
+            self.map_writer.flush()
 
-                sys.stderr = open(os.devnull, 'w')
-                status_text.text("✅ Successfully translated sections!")
-                process_bar.progress(100)
-                st.success("✅ Successfully translated sections!")
-                process_b.empty()
-                status_text.empty()
-                sys.stderr = sys.__stderr__
+            sys.stderr = open(os.devnull, 'w')
+            status_text.text("🔍 Validating translation results ..")
+            process_bar.progress(95)
+            sys.stderr = sys.__stderr__
+
+            await self._val_fail_parts(Maxtry=Maxtry,
+                                 sections=sections,
+                                 captions=captions,
+                                 envs=envs,
+                                 session=session)
+
+            if self.translation_cache is not None:
+                self.log(f"Translation cache: {self.translation_cache.stats()}.")
+            self.log(f"LLM requests: {self.llm_client.limiter.stats()}.")
+            if self.llm_client.stream:
+                self.log(f"Streaming: {self.llm_client.stream_aborts} responses aborted early.")
+            if self.llm_client.rate_limiter.enabled:
+                self.log(f"Rate limit: {self.llm_client.rate_limiter.stats()}.")
+            self.log(f"✅ Successfully translated sections!")
+
+            sys.stderr = open(os.devnull, 'w')
+            status_text.text("✅ Successfully translated sections!")
+            process_bar.progress(100)
+            st.success("✅ Successfully translated sections!")
+            process_b.empty()
+            status_text.empty()
+            sys.stderr = sys.__stderr__
 
 
         elif self.trans_mode == 1:
@@ -147,78 +181,120 @@ class TranslatorAgent(BaseToolAgent):
             sys.stderr = open(os.devnull, "w")
             status_text = st.empty()
             sys.stderr = sys.__stderr__
-            async with aiohttp.ClientSession() as session:
-                error_parts = [error_part["num_or_ph"] for error_part in self.errors_report]
-                self.log(
-                    f"🤖💬 Starting retranslating for error parts:{error_parts}, the {error_retry_count + 1} chance for {Maxtry} total.")
-                sys.stderr = open(os.devnull, "w")
-                status_text.text(f"🤖💬 Starting retranslating for error parts:{error_parts}, the {error_retry_count + 1} chance for {Maxtry} total.")
-                sys.stderr = sys.__stderr__
-                await self._retranslate_error_parts(secs=sections,
-                                                    caps=captions,
-                                                    envs=envs,
-                                                    session=session)
-
-                self.save_file(Path(self.output_dir, "sections_map.json"), "json", sections)
-                self.save_file(Path(self.output_dir, "captions_map.json"), "json", captions)
-                self.save_file(Path(self.output_dir, "envs_map.json"), "json", envs)
-
-                self.fail_section_nums.clear()
-                self.fail_caption_phs.clear()
-                self.fail_env_phs.clear()
-                self.have_fail_parts = False
-
-                await self._val_fail_parts(Maxtry=Maxtry,
-                                           sections=sections,
-                                           captions=captions,
-                                           envs=envs,
-                                           session=session)
+            session = self.llm_client.session
+            error_parts = [error_part["num_or_ph"] for error_part in self.errors_report]
+            self.log(
+                f"🤖💬 Starting retranslating for error parts:{error_parts}, the {error_retry_count + 1} chance for {Maxtry} total.")
+            sys.stderr = open(os.devnull, "w")
+            status_text.text(f"🤖💬 Starting retranslating for error parts:{error_parts}, the {error_retry_count + 1} chance for {Maxtry} total.")
+            sys.stderr = sys.__stderr__
+            await self._retranslate_error_parts(secs=sections,
+                                                caps=captions,
+                                                envs=envs,
+                                                session=session)
+
+            self.map_writer.mark_dirty(sections_map=sections, captions_map=captions, envs_map=envs)
+            self.map_writer.flush()
+
+            self.fail_section_nums.clear()
+            self.fail_caption_phs.clear()
+            self.fail_env_phs.clear()
+            self.have_fail_parts = False
+
+            await self._val_fail_parts(Maxtry=Maxtry,
+                                       sections=sections,
+                                       captions=captions,
+                                       envs=envs,
+                                       session=session)
 
             self.log(f"✅ Successfully retranslated error parts!")
             sys.stderr = open(os.devnull, "w")
             status_text.text(f"✅ Successfully retranslated error parts!")
-            time.sleep(3)
-            status_text.empty()
             sys.stderr = sys.__stderr__
+            self._clear_later(status_text)
             
 
     async def translate(self,
                         section: Dict[str, Any],
                         envs: List[Dict[str, Any]],
                         captions: List[Dict[str, Any]],
-                        session: aiohttp.ClientSession) -> Dict[str, Any]:
+                        session: aiohttp.ClientSession,
+                        sem: Optional[AdaptiveLimiter] = None) -> Dict[str, Any]:
         """
         Translates the input data (异步)
+        The section and the envs/captions it references are independent requests, so they are sent
+        concurrently, each one taking its own slot of sem.
         """
-        placeholder_pattern_cap = r"<PLACEHOLDER_CAP_\d+>"
-        placeholder_pattern_env = r"<PLACEHOLDER_ENV_\d+>"
-        placeholders_cap = re.findall(placeholder_pattern_cap, section["content"])
-        placeholders_env = re.findall(placeholder_pattern_env, section["content"])
+        if self.part_index is None or self.part_index.envs is not envs or self.part_index.captions is not captions:
+            self.part_index = PartIndex(captions=captions, envs=envs)
+        # envs and captions referenced by the section, including captions inside its envs
+        env_ids, cap_ids = self.part_index.children(section["content"])
+
+        jobs = {}
+        if section["section"] != "-1" and section["section"] != "0" and not self._is_resumed(section):
+            jobs["sec", None] = self._translate_section(section, session)
+        for i in env_ids:
+            if not self._is_resumed(envs[i]):
+                jobs["env", i] = self._translate_env(envs[i], session)
+        for i in cap_ids:
+            if not self._is_resumed(captions[i]):
+                jobs["cap", i] = self._translate_caption(captions[i], session)  # 异步翻译标题
+
+        results = await asyncio.gather(*(self._run_limited(job, sem) for job in jobs.values()))
+        for (part, i), result in zip(jobs, results):
+            if part == "sec":
+                section = result
+            elif part == "env":
+                envs[i] = result
+            else:
+                captions[i] = result
 
+        return section
 
-        if(section["section"] == "-1" or section["section"] == "0"):
-            section = section
-        else:
-            section = await self._translate_section(section, session)  # 注意异步调用
-
-        for placeholder in placeholders_env:
-            for i, env in enumerate(envs):
-                if placeholder == env["placeholder"]:
-                    placeholders_cap_in_env = re.findall(placeholder_pattern_cap, env["content"])
-                    placeholders_cap.extend(placeholders_cap_in_env)
-                    envs[i] = await self._translate_env(env, session)  #目前象征性修改,env方法好像没有使用,其下游方法没有异步修改
-                    break
+    async def _run_limited(self, coro, sem: Optional[AdaptiveLimiter] = None):
+        """
+        Await coro while holding a slot of sem (if given).
+        """
+        if sem is None:
+            return await coro
+        async with sem:
+            return await coro
 
-        # remove duplicates
-        placeholders_cap = list(dict.fromkeys(placeholders_cap))
+    async def _cache_translation(self, type: str, fail_part: str, text: str, trans_text: str, cache_context: Dict[str, Any]) -> None:
+        """
+        Cache trans_text as the translation of text if it passes the checks of ValidatorAgent, else drop the entry,
+        so a translation with lost placeholders or broken braces is never served from the cache.
+        The checks parse both texts with LatexWalker, so they run in a worker thread to keep the event loop free.
+        """
+        if self.translation_cache is None:
+            return
+        self._cache_contexts[(type, fail_part)] = (text, cache_context)
+        errors = await asyncio.get_running_loop().run_in_executor(
+            None, self._validator._validate, {"content": text, "trans_content": trans_text})
+        if self.translation_cache is None:
+            return
+        if errors:
+            self.translation_cache.delete(text, **cache_context)
+        else:
+            self.translation_cache.put(text, trans_text, **cache_context)
 
-        for placeholder in placeholders_cap:
-            for i, caption in enumerate(captions):
-                if placeholder == caption["placeholder"]:
-                    captions[i] = await self._translate_caption(caption, session)  # 异步翻译标题
-                    break
+    def close(self) -> None:
+        """
+        Release the translation cache once the project is translated and validated.
+        """
+        if self.translation_cache is not None:
+            self.translation_cache.close()
+            self.translation_cache = None
 
-        return section
+    def _is_resumed(self, part: Dict[str, Any]) -> bool:
+        """
+        In resume mode, whether the part was already translated by a previous run.
+        Failed requests return the source text, so a trans_content equal to the content counts as not translated.
+        """
+        if not self.resume:
+            return False
+        trans_content = part.get("trans_content", "")
+        return bool(trans_content) and trans_content != part["content"]
     
     async def _val_fail_parts(self, sections, captions, envs, Maxtry, session: aiohttp.ClientSession, fail_retry_count=0) -> str:
             sys.stderr = open(os.devnull, 'w')
@@ -231,7 +307,6 @@ class TranslatorAgent(BaseToolAgent):
                     sys.stderr = open(os.devnull, "w")
                     status_text.error(f"❌ Failed to translate {fail_parts}")
                     st.error(f"❌ Failed to translate {fail_parts}")
-                    time.sleep(3)
                     sys.stderr = sys.__stderr__
                     break
                 self.log(f"🤖💬 Starting retranslating for fail parts:{fail_parts}, the {fail_retry_count+1} chance for {Maxtry} total.")
@@ -242,13 +317,12 @@ class TranslatorAgent(BaseToolAgent):
                                             caps=captions,
                                             envs=envs,
                                             session=session)
-                self.save_file(Path(self.output_dir, "sections_map.json"), "json", sections)
-                self.save_file(Path(self.output_dir, "captions_map.json"), "json", captions)
-                self.save_file(Path(self.output_dir, "envs_map.json"), "json", envs)
+                self.map_writer.mark_dirty(sections_map=sections, captions_map=captions, envs_map=envs)
+                self.map_writer.flush()
                 
                 fail_retry_count += 1
+                self._clear_later(status_text)
                 sys.stderr = open(os.devnull, 'w')
-                time.sleep(3)
                 status_text = st.empty()
                 sys.stderr = sys.__stderr__
 
@@ -265,135 +339,91 @@ class TranslatorAgent(BaseToolAgent):
         self.fail_env_phs.clear()
         self.have_fail_parts = False
 
-        sec_dict = {s["section"]: i for i, s in enumerate(secs)}
-        cap_dict = {c["placeholder"]: i for i, c in enumerate(caps)}
-        env_dict = {e["placeholder"]: i for i, e in enumerate(envs)}
+        part_index = PartIndex(sections=secs, captions=caps, envs=envs)
+        sem = self.llm_client.limiter
+
+        # 失败部分之间互不依赖, 并发重译
+        async def retranslate(parts, i, translate_part):
+            parts[i] = await self._run_limited(translate_part(parts[i], session), sem)
 
+        jobs = []
         if sec_nums:
             self.log(f"Retranslating for {sec_nums}")
             for sec_num in sec_nums:
                 if sec_num == "-1" or sec_num == "0":
                     continue
-                if sec_num in sec_dict:
-                    i = sec_dict[sec_num]
-                    secs[i] = await self._translate_section(secs[i], session)
-            # else:
-            #     print(f"[Warning] Section {sec_num} not found.")
+                i = part_index.index_of("sec", sec_num)
+                if i is not None:
+                    jobs.append(retranslate(secs, i, self._translate_section))
         if cap_phs:
             self.log(f"Retranslating for {cap_phs}")
             for cap_ph in cap_phs:
-                if cap_ph in cap_dict:
-                    i = cap_dict[cap_ph]
-                    caps[i] = await self._translate_caption(caps[i], session) # env和caption也需要改
-            # else:
-            #     print(f"[Warning] Caption placeholder {cap_ph} not found.")
+                i = part_index.index_of("cap", cap_ph)
+                if i is not None:
+                    jobs.append(retranslate(caps, i, self._translate_caption))
         if env_phs:
             self.log(f"Retranslating for {env_phs}")
             for env_ph in env_phs:
-                if env_ph in env_dict:
-                    i = env_dict[env_ph]
-                    envs[i] = await self._translate_env(envs[i], session) # env和caption也需要改
-            # else:
-            #     print(f"[Warning] Environment placeholder {env_ph} not found.")
+                i = part_index.index_of("env", env_ph)
+                if i is not None:
+                    jobs.append(retranslate(envs, i, self._translate_env))
+        await asyncio.gather(*jobs)
 
     async def _retranslate_error_parts(self, secs, caps, envs, session) -> Any:
 
-        async with aiohttp.ClientSession() as session:
-            sem = asyncio.Semaphore(20)  # 考虑到api响应速度,大概10s左右处理一个section,每半秒启动一次调用,10左右应该不会浪费api token
+        sem = self.llm_client.limiter  # 自适应并发(AIMD), 见[llm_config]中的concurrency配置
+        part_index = PartIndex(sections=secs, captions=caps, envs=envs)
 
+        sys.stderr = open(os.devnull, 'w')
+        process_b = st.empty()
+        with process_b:
+            process_bar = process_b.progress(0)
+        status_text = st.empty()
+        sys.stderr = sys.__stderr__
+        completed = 0
+        async def process_ErrorPart(i, error_report):
+            async with sem:
+                error_message = []
+                if "command_error" in error_report:
+                    error_message.append(error_report["command_error"])
+                if "ph_error" in error_report:
+                    error_message.append(error_report["ph_error"])
+                if "bracket_error" in error_report:
+                    error_message.append(error_report["bracket_error"])
+                error_message = "\n".join(error_message)
+
+                i = part_index.index_of(error_report["part"], error_report["num_or_ph"])
+                if i is None:
+                    return None
+                if error_report["part"] == "sec":
+                    secs[i] = await self._translate_section(section=secs[i], error_message=error_message,
+                                                            session=session)
+                elif error_report["part"] == "env":
+                    envs[i] = await self._translate_env(env=envs[i], error_message=error_message,
+                                                        session=session)
+                elif error_report["part"] == "cap":
+                    caps[i] = await self._translate_caption(caption=caps[i], error_message=error_message,
+                                                            session=session)
+                return i
+
+        tasks_ErrorPart = [process_ErrorPart(i, error_report) for i, error_report in enumerate(self.errors_report)]
+        for future in tqdm(asyncio.as_completed(tasks_ErrorPart), total=len(tasks_ErrorPart), desc="Translating...",
+                           unit="section"):
+            result = await future
+            completed += 1
             sys.stderr = open(os.devnull, 'w')
-            process_b = st.empty()
-            with process_b:
-                process_bar = process_b.progress(0)
-            status_text = st.empty()
-            sys.stderr = sys.__stderr__
-            completed = 0
-            async def process_ErrorPart(i, error_report):
-                async with sem:
-                    error_message = []
-                    if "command_error" in error_report:
-                        error_message.append(error_report["command_error"])
-                    if "ph_error" in error_report:
-                        error_message.append(error_report["ph_error"])
-                    if "bracket_error" in error_report:
-                        error_message.append(error_report["bracket_error"])
-                    error_message = "\n".join(error_message)
-
-                    if error_report["part"] == "sec":
-                        async def process_section(i, sec):
-                            async with sem:
-                                if error_report["num_or_ph"] == sec["section"]:
-                                    sec_async = await self._translate_section(section=sec, error_message=error_message,
-                                                                              session=session)
-                                    return {"index": i, "result": sec_async, "is_valid": True}
-                                else:
-                                    return {"index": None, "result": None, "is_valid": False}
-
-                        tasks_sec = [process_section(i, sec) for i, sec in enumerate(secs)]
-                        for future in asyncio.as_completed(tasks_sec):
-                            result = await future
-                            # 只有处理目标caption时才会返回有意义的结果
-                            if result["is_valid"]:  # 确保i不是None
-                                i = result["index"]
-                                _sec = result["result"]
-                                secs[i] = _sec
-                    elif error_report["part"] == "env":
-                        async def process_env(i, env):
-                            async with sem:
-                                if error_report["num_or_ph"] == env["placeholder"]:
-                                    env_async = await self._translate_env(env=env, error_message=error_message,
-                                                                          session=session)
-                                    return {"index": i, "result": env_async, "is_valid": True}
-                                else:
-                                    return {"index": None, "result": None, "is_valid": False}
-
-                        tasks_env = [process_env(i, env) for i, env in enumerate(envs)]
-                        for future in asyncio.as_completed(tasks_env):
-                            result = await future
-                            # 只有处理目标caption时才会返回有意义的结果
-                            if result["is_valid"]:  # 确保i不是None
-                                i = result["index"]
-                                _env = result["result"]
-                                envs[i] = _env
-                    elif error_report["part"] == "cap":
-                        async def process_cap(i, cap):
-                            async with sem:
-                                if error_report["num_or_ph"] == cap["placeholder"]:
-                                    cap_async = await self._translate_caption(caption=cap, error_message=error_message,
-                                                                              session=session)
-                                    return {"index": i, "result": cap_async, "is_valid": True}
-                                else:
-                                    return {"index": None, "result": None, "is_valid": False}
-
-                        tasks_cap = [process_cap(i, cap) for i, cap in enumerate(caps)]
-                        for future in asyncio.as_completed(tasks_cap):
-                            result = await future
-                            # 只有处理目标caption时才会返回有意义的结果
-                            if result["is_valid"]:  # 确保i不是None
-                                i = result["index"]
-                                _cap = result["result"]
-                                caps[i] = _cap
-                    return i
-
-            tasks_ErrorPart = [process_ErrorPart(i, error_report) for i, error_report in enumerate(self.errors_report)]
-            for future in tqdm(asyncio.as_completed(tasks_ErrorPart), total=len(tasks_ErrorPart), desc="Translating...",
-                               unit="section"):
-                result = await future
-                completed += 1
-                sys.stderr = open(os.devnull, 'w')
-                process_bar.progress(completed / len(tasks_ErrorPart))
-                status_text.text(f"Completed {completed}/{len(tasks_ErrorPart)} part（{completed / len(tasks_ErrorPart):.1%}）")
-                sys.stderr = sys.__stderr__
-                # 只有处理目标caption时才会返回有意义的结果
-                if result is not None:  # 确保i不是None
-                    i = result
-            sys.stderr = open(os.devnull, 'w')
-            process_bar.progress(100)
-            status_text.text("Complete a retranslation once")
-            time.sleep(3)
-            process_b.empty()
-            status_text.empty()
+            process_bar.progress(completed / len(tasks_ErrorPart))
+            status_text.text(f"Completed {completed}/{len(tasks_ErrorPart)} part（{completed / len(tasks_ErrorPart):.1%}）")
             sys.stderr = sys.__stderr__
+            # 只有处理目标caption时才会返回有意义的结果
+            if result is not None:  # 确保i不是None
+                i = result
+        sys.stderr = open(os.devnull, 'w')
+        process_bar.progress(100)
+        status_text.text("Complete a retranslation once")
+        sys.stderr = sys.__stderr__
+        self._clear_later(process_b, status_text)
+
     async def _translate_section(self, section: Dict[str, Any], session: aiohttp.ClientSession, error_message=None) -> \
     Dict[str, Any]:
         """只修改了mode0的异步操作,后续mode的修改需要把对应request方法也修改"""
@@ -584,6 +614,12 @@ class TranslatorAgent(BaseToolAgent):
                                      type: str,
                                      session: aiohttp.ClientSession) -> str:
         """修改后的异步版本,注意其上游函数都需要异步运行,整个流程需要进入异步循环"""
+        cache_context = self._cache_context(system_prompt)
+        if self.translation_cache is not None:
+            cached = self.translation_cache.get(text, **cache_context)
+            if cached is not None:
+                return cached
+
         payload = {
             "model": f"{self.model}",
             "messages": [
@@ -594,32 +630,23 @@ class TranslatorAgent(BaseToolAgent):
             "max_new_tokens": 8192
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.API_KEY}",
-            "Content-Type": "application/json"
-        }
+        try:
+            trans_text = await self.llm_client.complete(payload, session=session, name=f"request to translate {fail_part}",
+                                                        make_checker=lambda: StreamChecker(text))
+        except Exception as e:
+            self.have_fail_parts = True
+            if type == 'sec':
+                self.fail_section_nums.append(fail_part)
+            elif type == 'cap':
+                self.fail_caption_phs.append(fail_part)
+            else:
+                self.fail_env_phs.append(fail_part)
 
-        for attempt in range(1, 4):
-            try:
-                async with session.post(self.base_url, json=payload, headers=headers, timeout=100) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-                    return result["choices"][0]["message"]["content"].strip()
-
-            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                if attempt < 3:
-                    await asyncio.sleep(5)
-                else:
-                    self.have_fail_parts = True
-                    if type == 'sec':
-                        self.fail_section_nums.append(fail_part)
-                    elif type == 'cap':
-                        self.fail_caption_phs.append(fail_part)
-                    else:
-                        self.fail_env_phs.append(fail_part)
+            print(f"❌ Failed to translate text, return the original text:{fail_part}. {e}")
+            return text
 
-                    print(f"❌ Failed to translate text, return the original text:{fail_part}. {e}")
-                    return text
+        await self._cache_translation(type, fail_part, text, trans_text, cache_context)
+        return trans_text
 
     async def _request_llm_for_trans_with_terms(self,
                                           system_prompt: str,
@@ -633,7 +660,11 @@ class TranslatorAgent(BaseToolAgent):
         #     print("ffffff")
         #     return text
 
-
+        cache_context = self._cache_context(system_prompt, glossary=self.term_dict)
+        if self.translation_cache is not None:
+            cached = self.translation_cache.get(text, **cache_context)
+            if cached is not None:
+                return cached
 
         payload = {
             "model": f"{self.model}",
@@ -652,33 +683,23 @@ class TranslatorAgent(BaseToolAgent):
             "max_new_tokens": 8192
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        for attempt in range(1, 4):
-            try:
-                async with session.post(self.base_url, json=payload, headers=headers, timeout=100) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-                    return result["choices"][0]["message"]["content"].strip()
-
-            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                if attempt < 3:
-                    await asyncio.sleep(5)
-                else:
-                    self.have_fail_parts = True
-                    if type == 'sec':
-                        self.fail_section_nums.append(fail_part)
-                    elif type == 'cap':
-                        self.fail_caption_phs.append(fail_part)
-                    else:
-                        self.fail_env_phs.append(fail_part)
+        try:
+            trans_text = await self.llm_client.complete(payload, session=session, name=f"request to translate {fail_part}",
+                                                        make_checker=lambda: StreamChecker(text))
+        except Exception as e:
+            self.have_fail_parts = True
+            if type == 'sec':
+                self.fail_section_nums.append(fail_part)
+            elif type == 'cap':
+                self.fail_caption_phs.append(fail_part)
+            else:
+                self.fail_env_phs.append(fail_part)
 
-                    print(f"❌ Failed to translate text, return the original text:{fail_part}. {e}")
+            print(f"❌ Failed to translate text, return the original text:{fail_part}. {e}")
+            return text
 
-                    return text
+        await self._cache_translation(type, fail_part, text, trans_text, cache_context)
+        return trans_text
 
     async def _request_llm_for_retrans_error_parts(self,
                                                    system_prompt: str,
@@ -707,36 +728,26 @@ class TranslatorAgent(BaseToolAgent):
             "max_new_tokens": 8192
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        for attempt in range(1, 4):
-            try:
-                async with session.post(self.base_url, json=payload, headers=headers, timeout=100) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-                    return result["choices"][0]["message"]["content"].strip()
-
-            except requests.exceptions.RequestException as e:
-                # print(f"⚠️ The {attempt}th request to translate {fail_part} failed: {e}")
-                if attempt < 3:
-                    await asyncio.sleep(5)
-                else:
-                    self.have_fail_parts = True
-                    if type == 'sec':
-                        self.fail_section_nums.append(fail_part)
-                    elif type == 'cap':
-                        self.fail_caption_phs.append(fail_part)
-                    else:
-                        self.fail_env_phs.append(fail_part)
+        try:
+            trans_text = await self.llm_client.complete(payload, session=session, name=f"request to retranslate {fail_part}")
+        except Exception as e:
+            self.have_fail_parts = True
+            if type == 'sec':
+                self.fail_section_nums.append(fail_part)
+            elif type == 'cap':
+                self.fail_caption_phs.append(fail_part)
+            else:
+                self.fail_env_phs.append(fail_part)
 
-                    print(f"❌ Failed to translate text, return the original text:{fail_part}. {e}")
-                    return part["trans_content"]
+            print(f"❌ Failed to translate text, return the original text:{fail_part}. {e}")
+            return part["trans_content"]
 
+        # 纠错后的译文覆盖缓存中原先的译文
+        if (type, fail_part) in self._cache_contexts:
+            text, cache_context = self._cache_contexts[(type, fail_part)]
+            await self._cache_translation(type, fail_part, text, trans_text, cache_context)
+        return trans_text
 
-             
     async def _request_llm_for_extract_terms(self, system_prompt, src, tgt,
                                        session: aiohttp.ClientSession) -> str:
 
@@ -757,24 +768,23 @@ class TranslatorAgent(BaseToolAgent):
             # "max_tokens": 50
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.API_KEY}",
-            "Content-Type": "application/json"
-        }
+        try:
+            return await self.llm_client.complete(payload, session=session, name="request to extract terms")
+        except Exception as e:
+            print(f"⚠️ Failed to extract terms, set N/A.")
+            return "N/A"
 
-        for attempt in range(1, 4):
-            try:
-                async with session.post(self.base_url, json=payload, headers=headers, timeout=100) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-                    return result["choices"][0]["message"]["content"].strip()
-
-            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                if attempt < 3:
-                    await asyncio.sleep(5)
-                else:
-                    print(f"⚠️ Failed to extract terms, set N/A.")
-                    return "N/A"
+    def _cache_context(self, system_prompt: str, glossary: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Everything besides the content that decides a translation, used to key the translation cache.
+        """
+        return {
+            "model": self.model,
+            "source_language": self.config.get("source_language", "en"),
+            "target_language": self.target_language,
+            "system_prompt": system_prompt,
+            "glossary": glossary
+        }
 
     def _request_llm_for_summary(self, system_prompt: str, text: str) -> str:
         """
@@ -797,24 +807,11 @@ class TranslatorAgent(BaseToolAgent):
             "max_new_tokens": 8192
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        for attempt in range(1, 4):
-            try:
-                response = requests.post(self.base_url, json=payload, headers=headers, timeout=100)
-                response.raise_for_status()  
-                result = response.json()
-                return result["choices"][0]["message"]["content"].strip()
-            except requests.exceptions.RequestException as e:
-                if attempt < 3:
-                    print(f"{e}")
-                    time.sleep(3)  
-                else:
-                    print(f"⚠️ Failed to summarize text, set N/A.")
-                    return "N/A"
+        try:
+            return self.llm_client.complete_sync(payload, name="request to summarize")
+        except Exception as e:
+            print(f"⚠️ Failed to summarize text, set N/A.")
+            return "N/A"
 
     def _request_llm_for_refine_summary(self, system_prompt: str, text: str, sum: str) -> str:
         """
@@ -837,24 +834,11 @@ class TranslatorAgent(BaseToolAgent):
             "max_new_tokens": 8192
         }
 
-        headers = {
-            "Authorization": f"Bearer {self.API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        for attempt in range(1, 4):
-            try:
-                response = requests.post(self.base_url, json=payload, headers=headers, timeout=100)
-                response.raise_for_status()  
-                result = response.json()
-                return result["choices"][0]["message"]["content"].strip()
-            except requests.exceptions.RequestException as e:
-                if attempt < 3:
-                    print(f"{e}")
-                    time.sleep(3)  
-                else:
-                    print(f"⚠️ Failed to refine summary, set N/A.")
-                    return "N/A"
+        try:
+            return self.llm_client.complete_sync(payload, name="request to refine summary")
+        except Exception as e:
+            print(f"⚠️ Failed to refine summary, set N/A.")
+            return "N/A"
 
     def _updated_term_dict(self, text: str) -> None:
         """
@@ -1,5 +1,6 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from src.agents.tool_agents.base_tool_agent import BaseToolAgent
+from src.formats.latex.part_index import PartIndex
 # from base_tool_agent import BaseToolAgent
 from pathlib import Path
 from collections import Counter
@@ -242,9 +243,7 @@ class ValidatorAgent(BaseToolAgent):
         envs: List[Dict],
         errors_report: List[Dict]) -> List[Dict]:
 
-        section_lookup = {s["section"]: s for s in secs}
-        caption_lookup = {c["placeholder"]: c for c in caps}
-        environment_lookup = {e["placeholder"]: e for e in envs}
+        part_index = PartIndex(sections=secs, captions=caps, envs=envs)
         
         parts_to_validate = []
         
@@ -255,13 +254,7 @@ class ValidatorAgent(BaseToolAgent):
             if not part_type or not identifier:
                 continue
                 
-            part = None
-            if part_type == "sec":
-                part = section_lookup.get(identifier)
-            elif part_type == "cap":
-                part = caption_lookup.get(identifier)
-            elif part_type == "env":
-                part = environment_lookup.get(identifier)
+            part = part_index.get(part_type, identifier)
             
             if part:
                 parts_to_validate.append(part)
@@ -269,6 +262,89 @@ class ValidatorAgent(BaseToolAgent):
         return parts_to_validate
     
 
+class StreamChecker:
+    """
+    Incremental placeholder and bracket checks of ValidatorAgent, run on a translation while it streams in.
+
+    feed() returns an error as soon as the output clearly diverges from the source, so the request can be
+    aborted and retried instead of generating the rest. Only errors later text cannot repair are reported:
+    a placeholder missing from the source or repeated, a block placeholder (an input or an env on its own
+    line) skipped, a closing brace without an opening one, commentary instead of a translation, or an output
+    far longer than the source.
+    """
+
+    placeholder_pattern = re.compile(r"<PLACEHOLDER_[^>]+?_begin>|<PLACEHOLDER_[^>]+?_end>|<PLACEHOLDER_(?:CAP|ENV)_\d+>")
+    # English openers only: target-language phrases like 这是/好的 also start genuine translations
+    commentary_pattern = re.compile(r"\s*(```|here is|here's|sure\b|certainly\b|below is)", re.IGNORECASE)
+
+    def __init__(self, source: str, max_ratio: float = 4.0):
+        self.source = source
+        self.max_length = int(max_ratio * len(source)) + 200
+        self.source_counts = Counter(self.placeholder_pattern.findall(source))
+        # placeholders alone on their line keep their order in any translation
+        self.block_placeholders = [line.strip() for line in source.splitlines()
+                                   if self.placeholder_pattern.fullmatch(line.strip())]
+        self.check_braces = self._brace_balance(source) is not None
+        self.check_commentary = not self.commentary_pattern.match(source)
+        self.text = ""
+        self.counts = Counter()
+        self.next_block = 0
+        self.depth = 0
+        self.escaped = False  # whether the text so far ends in an unpaired backslash
+        self._scan_pos = 0
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Add the next streamed chunk and return an error message if the translation has already failed.
+        """
+        self.text += chunk
+        if len(self.text) > self.max_length:
+            return f"Output is over {self.max_length} characters, much longer than the source."
+
+        if self.check_commentary and len(self.text.strip()) >= 20:
+            self.check_commentary = False
+            if self.commentary_pattern.match(self.text):
+                return f"Output starts with commentary: {self.text.strip()[:40]}"
+
+        for match in self.placeholder_pattern.finditer(self.text, self._scan_pos):
+            self._scan_pos = match.end()
+            placeholder = match.group()
+            self.counts[placeholder] += 1
+            if self.counts[placeholder] > self.source_counts[placeholder]:
+                return f"Extra placeholders: {placeholder} translation error or is redundant"
+            if placeholder in self.block_placeholders[self.next_block:]:
+                k = self.block_placeholders.index(placeholder, self.next_block)
+                if k > self.next_block:
+                    return f"Missing placeholders: {self.block_placeholders[self.next_block]} translation error or is missing!"
+                self.next_block = k + 1
+
+        if self.check_braces:
+            # the escape state carries over: a chunk may end inside "\\" or right before an escaped brace
+            balance = self._brace_balance(chunk, self.depth, self.escaped)
+            if balance is None:
+                return "Brackets error:\nExtra closing bracket '}'"
+            self.depth, self.escaped = balance
+        return None
+
+    def _brace_balance(self, content: str, depth: int = 0, escaped: bool = False) -> Optional[Tuple[int, bool]]:
+        """
+        Depth of unescaped curly braces after content and whether it ends in an unpaired backslash,
+        or None if a brace is closed that was never opened.
+        """
+        for char in content:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth < 0:
+                    return None
+        return depth, escaped
+
+
 # import toml
 # import argparse
 # from tqdm import tqdm
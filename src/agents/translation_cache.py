@@ -0,0 +1,177 @@
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+
+
+class TranslationCache:
+    """
+    Persistent content-hash cache of LLM translations for sections, captions and envs.
+
+    Entries are keyed by the model, the source/target language, the system prompt, the glossary and the
+    normalized content, so re-running a paper (or a new version with few edits) only sends changed parts
+    to the LLM. Numbered placeholders (<PLACEHOLDER_ENV_n>, <PLACEHOLDER_CAP_n>, <PLACEHOLDER_NEWCOMMAND_n>)
+    are renumbered by order of appearance before hashing and mapped back on a hit, so a part still hits
+    when an earlier insertion shifts the numbering. The cache is stored in SQLite and evicts the least
+    recently used entries beyond max_entries.
+
+    Configured by the optional [translation_cache] table of the TOML config:
+
+        enabled      turn the cache on, default false
+        path         SQLite file, default "cache/translations.sqlite3"
+        max_entries  number of translations kept, default 50000
+    """
+
+    placeholder_pattern = re.compile(r"<PLACEHOLDER_(ENV|CAP|NEWCOMMAND)_(\d+)>")
+
+    def __init__(self, path: str, max_entries: int = 50000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["TranslationCache"]:
+        """
+        Build the cache described by the config, or return None if it is disabled.
+        """
+        cache_config = config.get("translation_cache", {})
+        if not cache_config.get("enabled", False):
+            return None
+        return cls(path=cache_config.get("path", "cache/translations.sqlite3"),
+                   max_entries=int(cache_config.get("max_entries", 50000)))
+
+    def get(self,
+            content: str,
+            model: str,
+            source_language: str,
+            target_language: str,
+            system_prompt: str,
+            glossary: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Return the cached translation of content, or None on a miss.
+        """
+        normalized, placeholders = self._normalize(content)
+        key = self._make_key(normalized, model, source_language, target_language, system_prompt, glossary)
+        row = self._conn.execute("SELECT translation FROM translations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._conn.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return self._denormalize(row[0], placeholders)
+
+    def put(self,
+            content: str,
+            translation: str,
+            model: str,
+            source_language: str,
+            target_language: str,
+            system_prompt: str,
+            glossary: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store the translation of content, evicting the least recently used entries if the cache is full.
+        """
+        normalized, placeholders = self._normalize(content)
+        key = self._make_key(normalized, model, source_language, target_language, system_prompt, glossary)
+        local_ids = {placeholder: f"<PLACEHOLDER_{placeholder_type}_{i}>"
+                     for i, (placeholder, placeholder_type) in enumerate(placeholders, start=1)}
+        translation = self.placeholder_pattern.sub(lambda m: local_ids.get(m.group(), m.group()), translation)
+
+        exists = self._conn.execute("SELECT 1 FROM translations WHERE key = ?", (key,)).fetchone() is not None
+        self._conn.execute("INSERT OR REPLACE INTO translations (key, translation, last_used) VALUES (?, ?, ?)",
+                           (key, translation, time.time()))
+        if not exists:
+            self._size += 1
+        if self._size > self.max_entries:
+            overflow = self._size - self.max_entries
+            self._conn.execute("DELETE FROM translations WHERE key IN "
+                               "(SELECT key FROM translations ORDER BY last_used LIMIT ?)", (overflow,))
+            self._size -= overflow
+        self._conn.commit()
+
+    def delete(self,
+               content: str,
+               model: str,
+               source_language: str,
+               target_language: str,
+               system_prompt: str,
+               glossary: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Remove the translation of content, e.g. after it failed validation and was retranslated.
+        """
+        normalized, _ = self._normalize(content)
+        key = self._make_key(normalized, model, source_language, target_language, system_prompt, glossary)
+        deleted = self._conn.execute("DELETE FROM translations WHERE key = ?", (key,)).rowcount
+        self._size -= deleted
+        self._conn.commit()
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.1%} hit rate), {self._size} entries"
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _normalize(self, content: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        Normalize whitespace and renumber placeholders by order of appearance.
+        Returns the normalized text and the original (placeholder, type) list in local order.
+        """
+        content = "\n".join(line.rstrip() for line in content.replace("\r\n", "\n").split("\n")).strip()
+        placeholders = []
+        local_ids = {}
+
+        def renumber(match):
+            placeholder = match.group()
+            if placeholder not in local_ids:
+                placeholders.append((placeholder, match.group(1)))
+                local_ids[placeholder] = f"<PLACEHOLDER_{match.group(1)}_{len(placeholders)}>"
+            return local_ids[placeholder]
+
+        return self.placeholder_pattern.sub(renumber, content), placeholders
+
+    def _denormalize(self, translation: str, placeholders: List[Tuple[str, str]]) -> str:
+        original_ids = {f"<PLACEHOLDER_{placeholder_type}_{i}>": placeholder
+                        for i, (placeholder, placeholder_type) in enumerate(placeholders, start=1)}
+        return self.placeholder_pattern.sub(lambda m: original_ids.get(m.group(), m.group()), translation)
+
+    def _make_key(self,
+                  normalized: str,
+                  model: str,
+                  source_language: str,
+                  target_language: str,
+                  system_prompt: str,
+                  glossary: Optional[Dict[str, Any]]) -> str:
+        glossary_hash = ""
+        if glossary:
+            # identity entries for placeholders are added per project by add_placeholder and do not affect wording
+            terms = sorted((str(k), str(v)) for k, v in glossary.items() if not str(k).startswith("<PLACEHOLDER_"))
+            glossary_hash = hashlib.sha256(json.dumps(terms, ensure_ascii=False).encode("utf-8")).hexdigest()
+        fields = [
+            model,
+            source_language,
+            target_language,
+            hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+            glossary_hash,
+            hashlib.sha256(normalized.encode("utf-8")).hexdigest(),
+        ]
+        return hashlib.sha256(json.dumps(fields).encode("utf-8")).hexdigest()
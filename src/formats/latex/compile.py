@@ -1,12 +1,336 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import re
 import os
+import json
+import signal
+import asyncio
+import collections
 import subprocess
+import weakref
 from .utils import *
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def available_memory_mb() -> Optional[float]:
+    """
+    Memory available for new processes in MiB, or None if it cannot be measured here.
+    """
+    if psutil is not None:
+        return psutil.virtual_memory().available / 1024 / 1024
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class EnginePreference:
+    """
+    Learned order of the LaTeX engines to try, per document class and package set.
+
+    The outcome of every compilation is counted in a JSON file under three keys: the exact document class and
+    package set of the main file, the document class alone, and all documents. The engines are ordered by their
+    smoothed success rate at the most specific key with enough outcomes, so e.g. documents with ctex quickly
+    learn to go to xelatex first. fontspec and xeCJK, which pdflatex cannot load, start with xelatex first.
+    """
+
+    engines = ["pdflatex", "xelatex"]
+    xelatex_only_packages = {"fontspec", "xecjk", "unicode-math"}
+    min_samples = 2
+
+    _shared: Dict[str, "EnginePreference"] = {}
+
+    def __init__(self, path: str):
+        self.path = path
+        self.stats: Dict[str, Dict[str, List[int]]] = {}  # key -> engine -> [successes, failures]
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.stats = json.load(f)
+            except (OSError, ValueError):
+                print(f"⚠️ Warning: Could not read the engine statistics {path}, starting over.")
+
+    @classmethod
+    def shared(cls, path: str) -> "EnginePreference":
+        if path not in cls._shared:
+            cls._shared[path] = cls(path)
+        return cls._shared[path]
+
+    @staticmethod
+    def signature(tex: str) -> Tuple[str, List[str]]:
+        """
+        Document class and sorted package names of a main tex file.
+        """
+        tex = remove_comments(tex)
+        documentclass = re.search(r"\\documentclass\s*(?:\[[^\]]*\])?\s*\{([^}]*)\}", tex)
+        packages = set()
+        for names in re.findall(r"\\(?:usepackage|RequirePackage)\s*(?:\[[^\]]*\])?\s*\{([^}]*)\}", tex):
+            packages.update(name.strip() for name in names.split(",") if name.strip())
+        return (documentclass.group(1).strip() if documentclass else ""), sorted(packages)
+
+    def _keys(self, documentclass: str, packages: List[str]) -> List[str]:
+        return [f"{documentclass}:{'+'.join(packages)}", f"{documentclass}:*", "*"]
+
+    def order(self, documentclass: str, packages: List[str]) -> List[str]:
+        """
+        Engines in the order to try them.
+        """
+        if self.xelatex_only_packages & {package.lower() for package in packages}:
+            return ["xelatex", "pdflatex"]
+        for key in self._keys(documentclass, packages):
+            counts = self.stats.get(key, {})
+            if sum(sum(counts.get(engine, [0, 0])) for engine in self.engines) < self.min_samples:
+                continue
+            # 拉普拉斯平滑后的成功率, 相同时保持默认顺序
+            return sorted(self.engines, key=lambda engine: -(counts.get(engine, [0, 0])[0] + 1) / (sum(counts.get(engine, [0, 0])) + 2))
+        return list(self.engines)
+
+    def record(self, documentclass: str, packages: List[str], engine: str, success: bool) -> None:
+        for key in self._keys(documentclass, packages):
+            counts = self.stats.setdefault(key, {}).setdefault(engine, [0, 0])
+            counts[0 if success else 1] += 1
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.stats, f, ensure_ascii=False, indent=1)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+class LatexmkSlots:
+    """
+    Semaphore capping the latexmk processes on one event loop, which can also take several slots at once
+    without waiting (for a speculative race) and tells how many are free.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.free = size
+        self._waiters = collections.deque()
+
+    def try_acquire(self, count: int = 1) -> bool:
+        """
+        Take count slots if they are free now and nobody is queued before us, else take none.
+        """
+        if self._waiters or self.free < count:
+            return False
+        self.free -= count
+        return True
+
+    async def acquire(self) -> None:
+        if self.try_acquire():
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter  # release() hands the slot over
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self, count: int = 1) -> None:
+        self.free += count
+        while self.free and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.free -= 1
+                waiter.set_result(None)
+
+
 class LaTexCompiler:
-    def __init__(self, output_latex_dir: str):
+    """
+    Compiles the translated LaTeX project with latexmk.
+
+    compile() blocks until the PDF is built. compile_async() runs latexmk as an asyncio subprocess, so the event loop
+    keeps translating other papers meanwhile, and caps the latexmk processes running at once in this process.
+    It tries the engines in the order learned by EnginePreference; in speculative mode it starts all of them at
+    once, each in its own build directory, takes the first PDF and kills the other latexmk. The race only runs
+    when a latexmk slot is free for every engine, otherwise the engines run one after another in the learned
+    order, which is faster than a race whose processes queue for the same slot.
+    Read from the [compile] table of the TOML config:
+
+        max_latexmk        concurrent latexmk processes, default 0 (one per CPU core, as far as memory allows)
+        latexmk_memory_mb  memory budgeted per latexmk process when max_latexmk is 0, default 512
+        speculative        race pdflatex and xelatex instead of running them one after another, default false
+        engine_stats       JSON file of the learned engine preference ("" disables learning), default "cache/engine_stats.json"
+    """
+
+    _slots = weakref.WeakKeyDictionary()  # event loop -> LatexmkSlots shared by every compiler on that loop
+
+    def __init__(self, output_latex_dir: str, config: Optional[Dict[str, Any]] = None):
         self.output_latex_dir = output_latex_dir
+        compile_config = (config or {}).get("compile", {})
+        self.max_latexmk = int(compile_config.get("max_latexmk", 0))
+        self.latexmk_memory_mb = float(compile_config.get("latexmk_memory_mb", 512))
+        self.speculative = bool(compile_config.get("speculative", False))
+        engine_stats = compile_config.get("engine_stats", "cache/engine_stats.json")
+        self.preference = EnginePreference.shared(engine_stats) if engine_stats else None
+
+    @property
+    def max_processes(self) -> int:
+        if self.max_latexmk > 0:
+            return self.max_latexmk
+        cores = os.cpu_count() or 1
+        memory = available_memory_mb()
+        if memory is None:
+            return cores
+        return max(1, min(cores, int(memory // self.latexmk_memory_mb)))
+
+    def _latexmk_slots(self) -> LatexmkSlots:
+        loop = asyncio.get_running_loop()
+        if loop not in self._slots:
+            self._slots[loop] = LatexmkSlots(self.max_processes)
+        return self._slots[loop]
+
+    async def compile_async(self):
+        """
+        Compile the LaTeX document without blocking the event loop.
+        """
+        tex_file_to_compile = find_main_tex_file(self.output_latex_dir)
+        if not tex_file_to_compile:
+            print("⚠️ Warning: There is no main tex file to compile in this directory.")
+            return None
+
+        try:
+            documentclass, packages = EnginePreference.signature(read_tex_file(tex_file_to_compile))
+        except (OSError, UnicodeDecodeError):
+            documentclass, packages = "", []
+        engines = self.preference.order(documentclass, packages) if self.preference else list(EnginePreference.engines)
+
+        def record(engine: str, pdf_file: Optional[str]) -> None:
+            if self.preference:
+                self.preference.record(documentclass, packages, engine, pdf_file is not None)
+
+        slots = self._latexmk_slots()
+        if self.speculative and slots.try_acquire(len(engines)):
+            # 每个引擎各占一个名额, 竞速结束后一并归还
+            try:
+                pdf_file = await self._compile_speculative(tex_file_to_compile, engines, record)
+            finally:
+                slots.release(len(engines))
+        else:
+            if self.speculative:
+                # 名额不足时竞速的进程只会排队, 退回按学习到的顺序依次编译
+                print(f"⚠️  {slots.free} of {slots.size} latexmk slots free, compiling with {' then '.join(engines)} instead of racing.")
+            pdf_file = None
+            for k, engine in enumerate(engines):
+                print(f"Start compiling with {engine}...⏳")
+                pdf_file = await self._build(tex_file_to_compile, engine)
+                record(engine, pdf_file)
+                if pdf_file:
+                    print(f"✅  Successfully generated PDF file !") 
+                    break
+                if k + 1 < len(engines):
+                    print(f"⚠️  Failed to generate PDF with {engine}. 🔁Retrying with {engines[k + 1]}...⏳") 
+        if pdf_file:
+            return pdf_file
+
+        print(f"⚠️  Failed to generate PDF with {' and '.join(engines)}. Please check the log.")
+        for engine in engines:
+            out_dir = os.path.join(self.output_latex_dir, f"build_{engine}")
+            log_files = [os.path.join(out_dir, file) for file in os.listdir(out_dir) if file.lower().endswith('.log')] if os.path.isdir(out_dir) else []
+            if log_files:
+                print(f"📄 Log files for {engine}: {log_files}")
+        return None
+
+    async def _compile_speculative(self, tex_file: str, engines: List[str], record) -> Optional[str]:
+        """
+        Race the engines in separate build directories; the first PDF wins and the others are killed.
+        """
+        print(f"Start compiling with {' and '.join(engines)} concurrently...⏳")
+        # 名额已由 compile_async 预留
+        tasks = {asyncio.ensure_future(self._build(tex_file, engine, acquire=False)): engine for engine in engines}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pdf_file = task.result()
+                    record(tasks[task], pdf_file)
+                    if pdf_file:
+                        print(f"✅  Successfully generated PDF file with {tasks[task]} !")
+                        return pdf_file
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return None
+
+    async def _build(self, tex_file: str, engine: str, acquire: bool = True) -> Optional[str]:
+        """
+        Compile with engine into build_<engine> and return the PDF, if any.
+        """
+        out_dir = os.path.join(self.output_latex_dir, f"build_{engine}")
+        await self._compile_async(tex_file, out_dir, engine, acquire)
+        pdf_files = [os.path.join(out_dir, file) for file in os.listdir(out_dir) if file.lower().endswith('.pdf')]
+        return pdf_files[0] if pdf_files else None
+
+    async def _compile_async(self, tex_file: str, out_dir: str, engine: str, acquire: bool = True) -> bool:
+        """
+        Run latexmk with engine as a subprocess once a latexmk slot is free (acquire=False: the caller holds one).
+        """
+        os.makedirs(out_dir, exist_ok=True)
+
+        cmd = [
+            "latexmk",
+            f"-{engine}",
+            "-interaction=nonstopmode",   # no stop on errors
+            f"-outdir={out_dir}",
+            f"-file-line-error",
+            f"-synctex=1",
+            f"-f",                        # force mode
+            tex_file
+        ]
+        cwd = os.path.dirname(tex_file)
+        slots = self._latexmk_slots() if acquire else None
+        if slots is not None:
+            await slots.acquire()
+        try:
+            # 新进程组, 取消时连同 latexmk 启动的引擎一起结束
+            process = await asyncio.create_subprocess_exec(*cmd,
+                                                           cwd=cwd,
+                                                           stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.PIPE,
+                                                           start_new_session=os.name == "posix")
+            try:
+                await process.communicate()
+            except asyncio.CancelledError:
+                self._kill(process)
+                await process.wait()
+                raise
+        finally:
+            if slots is not None:
+                slots.release()
+
+        if process.returncode != 0:
+            print(f"⚠️  Somthing went wrong during compiling with {engine}.")
+            return False
+        print("✅  Compilation successful!") #compile success!
+        if engine == "pdflatex":
+            output_path = os.path.join(self.output_latex_dir, "success.txt")
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write("Compilation successful\n")
+        return True
+
+    def _kill(self, process: asyncio.subprocess.Process) -> None:
+        if process.returncode is not None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
 
     def compile(self):
         """
@@ -1,6 +1,5 @@
 from typing import Any, Dict, Optional
 from .utils import *
-import tiktoken
 import sys
 
 import streamlit as st
@@ -158,10 +157,7 @@ class LatexParser:
                              'multline', 'multline*', 'lstlisting', 'tcolorbox', 'thebibliography', 'bibliography', 'bibitem',
                              'algorithm', 'algorithmic', 'algorithmicx', 'algorithm2e', 'algorithmicx*', 'algorithmic*', 'algorithm*'
                              ]
-        while True:
-            result = pattern_env.search(full_tex)
-            if result is None:
-                break
+        def replacer(result):
             self.env_count += 1
             env_name = result.group(1)
             env_content = result.group(0)
@@ -177,7 +173,6 @@ class LatexParser:
                 need_trans = False
 
             placeholder = f"<PLACEHOLDER_ENV_{self.env_count}>"
-            full_tex = full_tex.replace(env_content, placeholder, 1)
             self.envs_json.append({
                 "placeholder": placeholder,
                 "env_name": env_name,
@@ -185,8 +180,11 @@ class LatexParser:
                 "trans_content": '',
                 "need_trans": need_trans
             })
-        
-        return full_tex
+            return placeholder
+
+        # Scan forward once: each environment is matched a single time and the text is rebuilt in one join,
+        # instead of restarting the search and copying the whole document for every environment.
+        return pattern_env.sub(replacer, full_tex)
 
     def _extract_captions(self, tex: str) -> str:
         """
@@ -198,21 +196,18 @@ class LatexParser:
         pattern_caption = get_command_pattern(command_name) # \caption{...} or \caption*{...} or \caption[...]{...}
         # pattern_captionof = get_captionof_pattern() # \captionof{type}{content} or \captionof*{type}{content}
 
-        while True:
-            result = pattern_caption.search(full_tex)
-            if result is None:
-                break
+        def replacer(result):
             self.caption_count += 1
             placeholder = f"<PLACEHOLDER_CAP_{self.caption_count}>"
-            full_tex = full_tex.replace(result.group(0), placeholder, 1)
             self.captions_json.append({
                 "placeholder": placeholder,
                 "cap_type":result.group(1),
                 "content": result.group(0),
                 "trans_content": ''
             })
+            return placeholder
 
-        return full_tex
+        return pattern_caption.sub(replacer, full_tex)
     
     def _extract_newcommands(self, tex: str) -> str:
         """
@@ -226,11 +221,9 @@ class LatexParser:
         full_tex = remove_comments(tex)
         pattern = get_newcommand_pattern() # \newcommand{name}[n_arguments]{content} or \renewcommand{name}[n_arguments]{content} or \newenvironment{name}[n_arguments]{content} or \renewenvironment{name}[n_arguments]{content}
         count = 0
-        
-        while True:
-            match = pattern.search(full_tex)
-            if match is None:
-                break
+
+        def replacer(match):
+            nonlocal count
             name1 = match.group(1)
             name2 = match.group(2)
             name = get_nonNone(name1, name2)
@@ -240,15 +233,15 @@ class LatexParser:
             else:
                 n_arguments = int(n_arguments)
             placeholder = f"<PLACEHOLDER_NEWCOMMAND_{count}>"
-            full_tex = full_tex.replace(match.group(0), placeholder, 1)
             self.newcommands_json.append({
                 "placeholder": placeholder,
                 "name": name,
                 "content": match.group(0)
             })
             count += 1
+            return placeholder
 
-        return full_tex
+        return pattern.sub(replacer, full_tex)
     
     def _split_to_sections(self, tex: str) -> Any:
         """
@@ -350,26 +343,30 @@ class LatexParser:
             })
 
     def _merge_short_sections(self, min_tokens=20):
-        enc = tiktoken.encoding_for_model("gpt-4")
+        enc = get_token_encoder("gpt-4")
         merged_sections = []
         i = 0
         sections = self.sections_json
+        # 每个 section 只编码一次，合并后的 token 数为各段之和
+        section_tokens = [len(enc.encode(section["content"])) for section in sections]
 
         while i < len(sections):
             # 初始化当前 section
-            combined_content = sections[i]["content"]
+            combined_contents = [sections[i]["content"]]
             combined_section_ids = [sections[i]["section"]]
-            total_tokens = len(enc.encode(combined_content))
+            total_tokens = section_tokens[i]
             start_section = sections[i]
             j = i + 1
 
             # 向后合并，直到达到 min_tokens 或结束
             while total_tokens < min_tokens and j < len(sections):
-                combined_content += "\n" + sections[j]["content"]
+                combined_contents.append(sections[j]["content"])
                 combined_section_ids.append(sections[j]["section"])
-                total_tokens = len(enc.encode(combined_content))
+                total_tokens += section_tokens[j]
                 j += 1
 
+            combined_content = "\n".join(combined_contents)
+
             # 合并成一个新的 section 数据
             if total_tokens < min_tokens and len(merged_sections) > 0:
                 # 太短，合并进前一段
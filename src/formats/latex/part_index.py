@@ -0,0 +1,86 @@
+from typing import Any, Dict, List, Optional, Tuple
+import re
+
+
+class PartIndex:
+    """
+    Placeholder/section number -> position index over the parsed maps.
+
+    Built once per run and shared by the translator, the validator and the constructor, so looking up the
+    env or caption behind a placeholder is a dict access instead of a scan of the whole map. The index keeps
+    positions rather than the dicts themselves, so it stays valid when a part is replaced in its list
+    (e.g. envs[i] = translated_env).
+
+    Part types follow the "part" field of errors_report: "sec", "cap", "env" and "newcommand".
+    """
+
+    placeholder_pattern = re.compile(r"<PLACEHOLDER_(ENV|CAP)_\d+>")
+
+    def __init__(self,
+                 sections: Optional[List[Dict[str, Any]]] = None,
+                 captions: Optional[List[Dict[str, Any]]] = None,
+                 envs: Optional[List[Dict[str, Any]]] = None,
+                 newcommands: Optional[List[Dict[str, Any]]] = None):
+        self.sections = sections if sections is not None else []
+        self.captions = captions if captions is not None else []
+        self.envs = envs if envs is not None else []
+        self.newcommands = newcommands if newcommands is not None else []
+        self._parts = {
+            "sec": self.sections,
+            "cap": self.captions,
+            "env": self.envs,
+            "newcommand": self.newcommands,
+        }
+        self._indexes = {
+            "sec": {sec["section"]: i for i, sec in enumerate(self.sections)},
+            "cap": {cap["placeholder"]: i for i, cap in enumerate(self.captions)},
+            "env": {env["placeholder"]: i for i, env in enumerate(self.envs)},
+            "newcommand": {newcommand["placeholder"]: i for i, newcommand in enumerate(self.newcommands)},
+        }
+
+    def index_of(self, part_type: str, key: str) -> Optional[int]:
+        """
+        Position of the part with the given section number or placeholder, or None if it is unknown.
+        """
+        return self._indexes.get(part_type, {}).get(key)
+
+    def get(self, part_type: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        The part with the given section number or placeholder, or None if it is unknown.
+        """
+        i = self.index_of(part_type, key)
+        return self._parts[part_type][i] if i is not None else None
+
+    def children(self, content: str) -> Tuple[List[int], List[int]]:
+        """
+        Positions of the envs and captions referenced by content, in order of appearance and without duplicates.
+        Captions inside a referenced env (e.g. a figure) are included after the captions of content itself.
+        """
+        env_ids = {}
+        cap_phs = []
+        env_cap_phs = []
+        for match in self.placeholder_pattern.finditer(content):
+            if match.group(1) == "CAP":
+                cap_phs.append(match.group())
+                continue
+            i = self.index_of("env", match.group())
+            if i is not None and i not in env_ids:
+                env_ids[i] = None
+                env_cap_phs.extend(m.group() for m in self.placeholder_pattern.finditer(self.envs[i]["content"])
+                                   if m.group(1) == "CAP")
+
+        cap_ids = [self.index_of("cap", placeholder) for placeholder in dict.fromkeys(cap_phs + env_cap_phs)]
+        return list(env_ids), [i for i in cap_ids if i is not None]
+
+    def replacements(self) -> Dict[str, str]:
+        """
+        Placeholder -> text to put back when constructing the translated tex.
+        """
+        replacements = {}
+        for env in self.envs:
+            replacements[env["placeholder"]] = env["trans_content"]
+        for caption in self.captions:
+            replacements[caption["placeholder"]] = caption["trans_content"]
+        for newcommand in self.newcommands:
+            replacements[newcommand["placeholder"]] = newcommand["content"]
+        return replacements
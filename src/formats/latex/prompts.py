@@ -21,6 +21,7 @@ caption_system_prompt_with_dict = None
 section_system_prompt_with_dict = None
 env_system_prompt_with_dict = None
 set_need_trans_for_envs_system_prompt = None
+set_need_trans_for_envs_batch_system_prompt = None
 retrans_error_parts_system_prompt = None
 extract_terminology_system_prompt = None
 refine_summary_system_prompt = None
@@ -34,7 +35,7 @@ section_system_prompt_with_terms_prev = None
 
 def init_prompts(source_lang: str, target_lang: str):
     global caption_system_prompt, section_system_prompt, env_system_prompt, caption_system_prompt_with_dict, section_system_prompt_with_dict, \
-        env_system_prompt_with_dict, set_need_trans_for_envs_system_prompt, retrans_error_parts_system_prompt, extract_terminology_system_prompt, \
+        env_system_prompt_with_dict, set_need_trans_for_envs_system_prompt, set_need_trans_for_envs_batch_system_prompt, retrans_error_parts_system_prompt, extract_terminology_system_prompt, \
         get_summary_system_prompt, refine_summary_system_prompt, section_system_prompt_with_sum, caption_system_prompt_with_sum, env_system_prompt_with_sum, \
         section_system_prompt_with_terms_sum, section_system_prompt_with_prev, section_system_prompt_with_terms_prev
 
@@ -224,6 +225,45 @@ def init_prompts(source_lang: str, target_lang: str):
     false
     """
 
+    set_need_trans_for_envs_batch_system_prompt = f"""
+    You are a LaTeX translation assistant.
+    
+    The user will send several LaTeX environments, each preceded by its index in square brackets, e.g. `[1]`, `[2]`, ...
+    For **each** environment, analyze the **content inside it**, regardless of its environment name, and determine whether it should be translated when translating an academic paper.
+    
+    Environment names can be custom-defined (e.g., `mybox`, `resultblock`, `customalgo`) and should be ignored during judgment. Only base your decision on the **content itself**.
+    
+    ---
+    
+    Judge each environment as:
+    - `true` → if the content includes human-readable natural language that contributes meaning to the paper and should be translated, such as explanations, definitions, figure/table captions, theorem statements, or descriptions written in {source_lang}.
+    - `false` → if the content includes only non-linguistic content such as code, pseudocode, markup, equations, math expressions, tables, graphics instructions (e.g., TikZ), or any content not meant for human reading.
+    
+    ---
+    
+    Output exactly one line per environment, in the same order, in the form `<index>: true` or `<index>: false`.
+    No explanations or additional text.
+    
+    ---
+    
+    Example:
+    
+    Input:
+    [1]
+    \begin{{mybox}}
+    A graph is connected if there is a path between every pair of vertices.
+    \end{{mybox}}
+    [2]
+    \begin{{customcode}}
+    for i in range(10):
+    print(i)
+    \end{{customcode}}
+    
+    Output:
+    1: true
+    2: false
+    """
+
     retrans_error_parts_system_prompt = f"""
     You are a professional academic translator and LaTeX translation corrector.  
     Your task is to revise and improve machine-translated LaTeX academic texts based on three components provided by the user: the original {source_lang} LaTeX source, the existing {target_lang} translation, and the error information describing the issue(s). Your revision must strictly preserve LaTeX syntax integrity and comply with the following rules.
@@ -2,6 +2,7 @@ from typing import List, Dict, Any
 import os
 import re
 from .utils import *
+from .part_index import PartIndex
 
 class LatexConstructor:
     def __init__(self, 
@@ -24,9 +25,7 @@ class LatexConstructor:
         construct the translated latex  project  from the sections, envs, captions and inputs
         """
         tex = self._merge_sections()
-        tex = self._revert_envs(tex)
-        tex = self._revert_captions(tex)
-        tex = self._revert_newcommands(tex)
+        tex = self._revert_placeholders(tex)
 
         # process japanese specific packages ----------
         # tex = self._comment_out_latex_packages_for_ja(tex)
@@ -40,73 +39,67 @@ class LatexConstructor:
         """
         Merge all the sections to a tex
         """
-        tex = ""
-        for section in self.sections:
-            tex += section["trans_content"] + "\n"
-        return tex
+        return "".join(section["trans_content"] + "\n" for section in self.sections)
 
-    def _revert_envs(self, tex: str) -> str:
+    def _revert_placeholders(self, tex: str) -> str:
         """
-        Revert all the envs to tex
+        Revert all the envs, captions and newcommands to tex in a single pass.
+        Placeholders nested in a replacement (e.g. captions inside a translated figure env) are resolved recursively.
         """
-        for env in self.envs:
-            placeholder = env["placeholder"]
-            tex = tex.replace(placeholder, env["trans_content"])
-
-        return tex
-             
-    def _revert_captions(self, tex: str) -> str:
-        """
-        Revert all the captions to tex
-        """
-        for caption in self.captions:
-            placeholder = caption["placeholder"]
-            tex = tex.replace(placeholder, caption["trans_content"])
-
-        return tex                              
-    
-    def _revert_newcommands(self, tex: str) -> str:
-        """
-        Revert all the newcommands to tex
-        """
-        for newcommand in self.newcommands:
-            placeholder = newcommand["placeholder"]
-            tex = tex.replace(placeholder, newcommand["content"])
-
-        return tex
+        replacements = PartIndex(captions=self.captions, envs=self.envs, newcommands=self.newcommands).replacements()
+
+        pattern = re.compile(r"<PLACEHOLDER_(?:ENV|CAP|NEWCOMMAND)_\d+>")
+        resolved = {}
+        resolving = set()
+
+        def resolve(placeholder: str) -> str:
+            if placeholder in resolved:
+                return resolved[placeholder]
+            if placeholder not in replacements or placeholder in resolving:
+                # unknown placeholder, or one that refers back to itself: keep it as is
+                return placeholder
+            resolving.add(placeholder)
+            text = pattern.sub(lambda match: resolve(match.group()), replacements[placeholder])
+            resolving.discard(placeholder)
+            resolved[placeholder] = text
+            return text
+
+        return pattern.sub(lambda match: resolve(match.group()), tex)
                                           
     def _revert_inputs(self, tex: str):
+        """
+        Write every input file and restore its \\input command in a single scan.
+        Text is collected as chunks on a stack of open inputs, so the document is never copied per input;
+        residual placeholders are reported and dropped by the same scan.
+        """
         begin_map = {sec["begin"]: sec for sec in self.inputs}
         end_map = {sec["end"]: sec for sec in self.inputs}
-        pattern = re.compile(r"<PLACEHOLDER_[^>]+?_begin>|<PLACEHOLDER_[^>]+?_end>")
+        pattern = re.compile(r"<PLACEHOLDER_[^>]*>")
 
-        stack = []
+        root_chunks = []
+        stack = []  # (begin_tag, chunks) for every input that is still open
+        residual_matches = []
         pos = 0  # 当前查找起点
 
-        while True:
-            match = pattern.search(tex, pos)
-            if not match:
-                break
-
+        for match in pattern.finditer(tex):
             tag = match.group()
+            chunks = stack[-1][1] if stack else root_chunks
+            chunks.append(tex[pos:match.start()])
+            pos = match.end()
 
             if tag in begin_map:
-                stack.append((tag, match.start()))
-                pos = match.end()  # 继续向后匹配
+                stack.append((tag, []))
             elif tag in end_map:
                 if not stack:
                     raise ValueError(f"Unmatched end tag: {tag}")
-                begin_tag, begin_pos = stack.pop()
+                begin_tag, inner_chunks = stack.pop()
                 if end_map[tag] != begin_map[begin_tag]:
                     raise ValueError(f"Mismatched tags: {begin_tag} vs {tag}")
 
                 input_info = begin_map[begin_tag]
-                end_pos = match.end()
 
                 # 提取中间内容
-                inner_start = begin_pos + len(begin_tag)
-                inner_end = match.start()
-                inner_content = tex[inner_start:inner_end].strip()
+                inner_content = "".join(inner_chunks).strip()
 
                 relative_path = input_info["path"]
                 if not relative_path.endswith(".tex"):
@@ -116,23 +109,28 @@ class LatexConstructor:
                     f.write(inner_content + "\n")
 
                 # 替换整个片段为 \input 命令
-                tex = tex[:begin_pos] + input_info["command"] + tex[end_pos:]
-
-                # 下一轮匹配从替换后位置继续
-                pos = begin_pos + len(input_info["command"])
+                parent_chunks = stack[-1][1] if stack else root_chunks
+                parent_chunks.append(input_info["command"])
 
             else:
                 # 万一匹配到不在 begin_map/end_map 中的标签
-                pos = match.end()
+                residual_matches.append(tag)
+
+        (stack[-1][1] if stack else root_chunks).append(tex[pos:])
 
         if stack:
             unclosed_tags = [tag for tag, _ in stack]
             print(f"⚠️ Warning: Unclosed begin placeholder(s) found and skipped: {unclosed_tags}")
-        
-        residual_matches = re.findall(r"<PLACEHOLDER_[^>]*>", tex)
+            # 未闭合的片段原样保留在父级中，仅去掉其 begin 占位符
+            while stack:
+                begin_tag, inner_chunks = stack.pop()
+                residual_matches.append(begin_tag)
+                (stack[-1][1] if stack else root_chunks).extend(inner_chunks)
+
         if residual_matches:
             print(f"⚠️ Warning: Residual placeholders found and removed: {residual_matches}")
-            tex = re.sub(r"<PLACEHOLDER_[^>]*>", "", tex)
+
+        tex = "".join(root_chunks)
 
         tex = add_ctex_package(tex) # zh
         # tex = add_ja_package(tex)  # ja
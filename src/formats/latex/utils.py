@@ -10,6 +10,8 @@ import zipfile
 import tarfile
 from tqdm import tqdm
 import regex
+import tiktoken
+import functools
 import subprocess
 import os
 import requests
@@ -575,6 +577,13 @@ def compress_newlines(tex):
     """
     return re.sub(r'(\s*\n\s*){3,}', '\n\n', tex)
 
+@functools.lru_cache(maxsize=None)
+def get_token_encoder(model: str = "gpt-4"):
+    """
+    Get the tiktoken encoder for the given model, created once and shared by the whole process.
+    """
+    return tiktoken.encoding_for_model(model)
+
 def get_env_pattern(command_name):
     """
     Get the regex pattern for matching environments.
@@ -0,0 +1,89 @@
+import asyncio
+
+from src.agents.concurrency import AdaptiveLimiter
+import src.agents.concurrency as concurrency
+
+
+def test_overload_decreases_multiplicatively_once_per_round_trip(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(concurrency.time, "monotonic", lambda: clock[0])
+    limiter = AdaptiveLimiter(initial=16, min_limit=3, backoff=0.5)
+    limiter.record_success(1.0)  # round trip of 1s
+    limiter.record_overload()
+    assert limiter.limit == 8
+    clock[0] += 0.5  # same round trip: a burst of 429s only backs off once
+    limiter.record_overload()
+    assert limiter.limit == 8
+    clock[0] += 1.0
+    limiter.record_overload()
+    assert limiter.limit == 4
+    clock[0] += 1.0
+    limiter.record_overload()
+    assert limiter.limit == 3  # min_limit
+    assert limiter.overloads == 4
+
+
+def test_increase_only_when_saturated():
+    async def run():
+        limiter = AdaptiveLimiter(initial=2, max_limit=4)
+        # idle: the limit is not the bottleneck and stays put
+        limiter.record_success(1.0)
+        assert limiter.limit == 2
+        await limiter.acquire()
+        limiter.record_success(1.0)
+        assert limiter.limit == 2
+        # every slot taken: additive increase of 1/limit per success
+        await limiter.acquire()
+        limiter.record_success(1.0)
+        assert limiter.limit == 2.5
+        # slow responses hold the limit
+        limiter.record_success(10.0)
+        assert limiter.limit == 2.5
+    asyncio.run(run())
+
+
+def test_fixed_limit_when_not_adaptive():
+    async def run():
+        limiter = AdaptiveLimiter(initial=1, adaptive=False)
+        await limiter.acquire()
+        limiter.record_success(1.0)
+        limiter.record_overload()
+        assert limiter.limit == 1
+    asyncio.run(run())
+
+
+def test_waiters_are_served_in_order():
+    async def run():
+        limiter = AdaptiveLimiter(initial=1)
+        order = []
+
+        async def request(name):
+            async with limiter:
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await limiter.acquire()
+        queued = [asyncio.create_task(request(f"queued{i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        limiter.release()
+        # a caller arriving after the release must not cut ahead of the woken waiter
+        late = asyncio.create_task(request("late"))
+        await asyncio.gather(*queued, late)
+        assert order == ["queued0", "queued1", "late"]
+        assert limiter._inflight == 0
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_passes_its_slot_on():
+    async def run():
+        limiter = AdaptiveLimiter(initial=1)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()  # hands the slot to first
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        await asyncio.wait_for(second, 1)
+        assert limiter._inflight == 1 and not limiter._waiters
+    asyncio.run(run())
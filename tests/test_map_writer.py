@@ -0,0 +1,74 @@
+import json
+import os
+
+from src.agents.map_writer import MapWriter
+from src.agents.tool_agents.base_tool_agent import BaseToolAgent
+import src.agents.map_writer as map_writer
+
+
+class Agent(BaseToolAgent):
+    def execute(self, data=None):
+        return data
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_flush_at_update_threshold(tmp_path, monkeypatch):
+    monkeypatch.setattr(map_writer.time, "monotonic", Clock())
+    saved = []
+    writer = MapWriter(lambda path, file_format, data: saved.append((os.path.basename(path), data)),
+                       str(tmp_path), flush_interval=60, flush_every=3)
+    writer.mark_dirty(sections_map=[1])
+    writer.mark_dirty(sections_map=[1, 2], envs_map=["a"])
+    assert saved == []
+    writer.mark_dirty(sections_map=[1, 2, 3])
+    # each dirty map is written once, with its latest data
+    assert sorted(saved) == [("envs_map.json", ["a"]), ("sections_map.json", [1, 2, 3])]
+    assert writer.flushes == 1
+
+
+def test_flush_at_time_threshold(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(map_writer.time, "monotonic", clock)
+    saved = []
+    writer = MapWriter(lambda path, file_format, data: saved.append(data), str(tmp_path), flush_interval=5, flush_every=100)
+    writer.mark_dirty(sections_map=[1])
+    assert saved == []
+    clock.now = 5.0
+    writer.mark_dirty(sections_map=[1, 2])
+    assert saved == [[1, 2]]
+
+
+def test_final_flush_writes_only_dirty_maps(tmp_path):
+    saved = []
+    writer = MapWriter(lambda path, file_format, data: saved.append(data), str(tmp_path), flush_interval=60, flush_every=100)
+    writer.flush()
+    assert saved == [] and writer.flushes == 0
+    writer.mark_dirty(captions_map=["c"])
+    writer.flush()
+    writer.flush()
+    assert saved == [["c"]] and writer.flushes == 1
+
+
+def test_save_file_replaces_atomically(tmp_path, monkeypatch):
+    agent = Agent("Agent")
+    path = tmp_path / "sections_map.json"
+    agent.save_file(path, "json", [{"section": "1"}])
+    assert json.loads(path.read_text(encoding="utf-8")) == [{"section": "1"}]
+    assert not os.path.exists(f"{path}.tmp")
+
+    # a write interrupted before the rename leaves the previous file intact
+    def interrupted(src, dst):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(os, "replace", interrupted)
+    try:
+        agent.save_file(path, "json", [{"section": "2"}])
+    except KeyboardInterrupt:
+        pass
+    assert json.loads(path.read_text(encoding="utf-8")) == [{"section": "1"}]
@@ -0,0 +1,47 @@
+from src.formats.latex.part_index import PartIndex
+
+
+def make_index():
+    sections = [{"section": "-1", "content": ""},
+                {"section": "1", "content": "See <PLACEHOLDER_ENV_2>, <PLACEHOLDER_CAP_1> and <PLACEHOLDER_ENV_2>."}]
+    captions = [{"placeholder": "<PLACEHOLDER_CAP_1>", "content": "A", "trans_content": "甲"},
+                {"placeholder": "<PLACEHOLDER_CAP_2>", "content": "B", "trans_content": "乙"}]
+    envs = [{"placeholder": "<PLACEHOLDER_ENV_1>", "content": "x", "trans_content": "x"},
+            {"placeholder": "<PLACEHOLDER_ENV_2>", "content": "\\caption{<PLACEHOLDER_CAP_2>}", "trans_content": "y"}]
+    newcommands = [{"placeholder": "<PLACEHOLDER_NEWCOMMAND_1>", "content": "\\newcommand{\\a}{b}"}]
+    return PartIndex(sections=sections, captions=captions, envs=envs, newcommands=newcommands)
+
+
+def test_lookups():
+    index = make_index()
+    assert index.index_of("sec", "1") == 1
+    assert index.index_of("cap", "<PLACEHOLDER_CAP_2>") == 1
+    assert index.index_of("env", "<PLACEHOLDER_ENV_1>") == 0
+    assert index.index_of("newcommand", "<PLACEHOLDER_NEWCOMMAND_1>") == 0
+    assert index.get("env", "<PLACEHOLDER_ENV_2>")["trans_content"] == "y"
+    assert index.index_of("env", "<PLACEHOLDER_ENV_9>") is None
+    assert index.get("cap", "<PLACEHOLDER_CAP_9>") is None
+    assert index.index_of("unknown", "1") is None
+
+
+def test_lookup_follows_replaced_parts():
+    index = make_index()
+    index.envs[1] = {**index.envs[1], "trans_content": "z"}
+    assert index.get("env", "<PLACEHOLDER_ENV_2>")["trans_content"] == "z"
+
+
+def test_children():
+    index = make_index()
+    # envs once each, then the captions of the content, then the captions inside its envs
+    assert index.children(index.sections[1]["content"]) == ([1], [0, 1])
+    assert index.children("no placeholders") == ([], [])
+
+
+def test_replacements():
+    assert make_index().replacements() == {
+        "<PLACEHOLDER_ENV_1>": "x",
+        "<PLACEHOLDER_ENV_2>": "y",
+        "<PLACEHOLDER_CAP_1>": "甲",
+        "<PLACEHOLDER_CAP_2>": "乙",
+        "<PLACEHOLDER_NEWCOMMAND_1>": "\\newcommand{\\a}{b}",
+    }
@@ -0,0 +1,63 @@
+import pytest
+
+from src.agents.concurrency import RateLimiter
+import src.agents.concurrency as concurrency
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(concurrency.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_disabled_never_waits(clock):
+    limiter = RateLimiter()
+    assert not limiter.enabled
+    assert all(limiter.reserve(10 ** 6) == 0 for _ in range(100))
+
+
+def test_requests_per_minute_burst_then_refill(clock):
+    limiter = RateLimiter(requests_per_minute=60)  # 1 request/s, bucket of 10s = 10 requests
+    assert [limiter.reserve(0) for _ in range(10)] == [0] * 10
+    assert limiter.reserve(0) == pytest.approx(1.0)
+    # debt queues later reservations in order
+    assert limiter.reserve(0) == pytest.approx(2.0)
+    clock[0] += 2.0
+    assert limiter.reserve(0) == pytest.approx(1.0)
+    assert limiter.waited == pytest.approx(4.0)
+
+
+def test_refill_is_capped_at_the_bucket(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    clock[0] += 3600.0
+    assert [limiter.reserve(0) for _ in range(10)] == [0] * 10
+    assert limiter.reserve(0) == pytest.approx(1.0)
+
+
+def test_tokens_per_minute(clock):
+    limiter = RateLimiter(tokens_per_minute=6000)  # 100 tokens/s, bucket of 1000 tokens
+    assert limiter.reserve(600) == 0
+    assert limiter.reserve(600) == pytest.approx(2.0)  # 200 tokens of debt
+    clock[0] += 2.0
+    assert limiter.reserve(100) == pytest.approx(1.0)
+
+
+def test_request_larger_than_the_bucket_waits_for_a_full_bucket(clock):
+    limiter = RateLimiter(tokens_per_minute=6000)
+    assert limiter.reserve(5000) == pytest.approx(40.0)  # 1000 in the bucket, 4000 of debt
+    clock[0] += 40.0
+    assert limiter.reserve(5000) == pytest.approx(50.0)
+
+
+def test_slowest_quota_sets_the_delay(clock):
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=6000)
+    assert limiter.reserve(1000) == 0
+    assert limiter.reserve(100) == pytest.approx(1.0)  # tokens are short, requests are not
+
+
+def test_shared_per_endpoint():
+    config = {"llm_config": {"base_url": "http://a", "model": "m", "requests_per_minute": 60}}
+    assert RateLimiter.shared(config) is RateLimiter.shared(config)
+    other = {"llm_config": {**config["llm_config"], "model": "n"}}
+    assert RateLimiter.shared(other) is not RateLimiter.shared(config)
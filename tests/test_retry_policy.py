@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+import requests
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from src.agents.retry_policy import RetryPolicy, RetryableError
+import src.agents.retry_policy as retry_policy
+
+
+def response_error(status, headers=None):
+    url = URL("http://llm.test/v1/chat/completions")
+    request_info = aiohttp.RequestInfo(url, "POST", CIMultiDictProxy(CIMultiDict()), url)
+    return aiohttp.ClientResponseError(request_info=request_info, history=(), status=status, headers=headers or {})
+
+
+def http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.exceptions.HTTPError(response=response)
+
+
+def test_full_jitter_bounds(monkeypatch):
+    policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+    bounds = []
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda low, high: bounds.append((low, high)) or high)
+    assert [policy.delay(attempt) for attempt in range(1, 7)] == [1.0, 2.0, 4.0, 8.0, 10.0, 10.0]
+    assert all(low == 0 for low, _ in bounds)
+    monkeypatch.undo()
+    assert all(0 <= policy.delay(3) <= 4.0 for _ in range(200))
+
+
+def test_retry_after_is_honoured_and_capped():
+    policy = RetryPolicy(base_delay=1.0, max_retry_after=30.0)
+    assert policy.delay(1, response_error(429, {"Retry-After": "7"})) == 7.0
+    assert policy.delay(1, http_error(503, {"Retry-After": "120"})) == 30.0
+    assert policy.delay(1, response_error(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert 0 <= policy.delay(1, response_error(429, {"Retry-After": "soon"})) <= 1.0
+
+
+@pytest.mark.parametrize("error", [
+    response_error(429), response_error(503), response_error(408), http_error(500),
+    asyncio.TimeoutError(), aiohttp.ServerDisconnectedError(), requests.exceptions.ConnectionError(),
+    RetryableError("malformed response"), json.JSONDecodeError("Expecting value", "", 0),
+])
+def test_retryable(error):
+    assert RetryPolicy().is_retryable(error)
+
+
+@pytest.mark.parametrize("error", [
+    response_error(400), response_error(401), http_error(403), http_error(404),
+    KeyError("choices"), IndexError(), TypeError(), ValueError(),
+])
+def test_not_retryable(error):
+    assert not RetryPolicy().is_retryable(error)
+
+
+def test_run_sync_retries_then_raises(monkeypatch):
+    monkeypatch.setattr(retry_policy.time, "sleep", lambda seconds: None)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise response_error(429)
+        return "ok"
+    assert RetryPolicy(max_attempts=3).run_sync(flaky) == "ok"
+
+    def failing():
+        calls.append(1)
+        raise response_error(500)
+    calls.clear()
+    with pytest.raises(aiohttp.ClientResponseError):
+        RetryPolicy(max_attempts=2).run_sync(failing)
+    assert len(calls) == 2
+
+
+def test_run_raises_non_retryable_at_once():
+    calls = []
+
+    async def request():
+        calls.append(1)
+        raise response_error(401)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(RetryPolicy(max_attempts=5).run(request))
+    assert len(calls) == 1
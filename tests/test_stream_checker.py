@@ -0,0 +1,41 @@
+from src.agents.tool_agents.validator_agent import StreamChecker
+
+
+def feed_all(checker, chunks):
+    for chunk in chunks:
+        error = checker.feed(chunk)
+        if error:
+            return error
+    return None
+
+
+def test_escaped_backslash_before_brace_split_across_chunks():
+    # "\\" is a line break, so the "{" after it opens a group even when the chunk ends between them
+    checker = StreamChecker(r"line \\{\bf b}")
+    assert feed_all(checker, ["line \\\\", r"{\bf b}"]) is None
+    assert (checker.depth, checker.escaped) == (0, False)
+
+
+def test_escaped_brace_split_across_chunks():
+    checker = StreamChecker(r"set \{a\} {b}")
+    assert feed_all(checker, ["set \\", "{a\\", "}", " {b}"]) is None
+    assert (checker.depth, checker.escaped) == (0, False)
+
+
+def test_extra_closing_brace_after_escaped_backslash():
+    checker = StreamChecker(r"line \\ {b}")
+    assert feed_all(checker, ["line \\\\", "} {b}"]) == "Brackets error:\nExtra closing bracket '}'"
+
+
+def test_chinese_openers_are_not_commentary():
+    # "This is a new method" / "A good representation" translate to 这是… / 好的…
+    for source, translation in [("This is a new method for unpaired image translation.", "这是一种用于非配对图像翻译的新方法，它不需要成对的训练数据。"),
+                                ("A good representation of the data is learned first.", "好的数据表示会首先被学习出来，然后再用于后续的生成任务。"),
+                                ("The following is our main result.", "以下是我们的主要结果，它在所有数据集上都优于基线方法。")]:
+        checker = StreamChecker(source)
+        assert feed_all(checker, [translation[:10], translation[10:]]) is None
+
+
+def test_english_commentary_aborts():
+    checker = StreamChecker("A new method for unpaired image translation.")
+    assert feed_all(checker, ["Here is the translation", " of the paragraph:"]).startswith("Output starts with commentary")
@@ -0,0 +1,73 @@
+from src.agents.translation_cache import TranslationCache
+import src.agents.translation_cache as translation_cache
+
+
+CONTEXT = {"model": "gpt-4o", "source_language": "en", "target_language": "ch", "system_prompt": "Translate."}
+
+
+def make_cache(tmp_path, max_entries=50000):
+    return TranslationCache(str(tmp_path / "translations.sqlite3"), max_entries=max_entries)
+
+
+def test_get_put_round_trip(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get("Hello world.", **CONTEXT) is None
+    cache.put("Hello world.", "你好，世界。", **CONTEXT)
+    assert cache.get("Hello world.", **CONTEXT) == "你好，世界。"
+    assert (cache.hits, cache.misses) == (1, 1)
+    # the key includes the prompt and the glossary
+    assert cache.get("Hello world.", **{**CONTEXT, "system_prompt": "Other."}) is None
+    assert cache.get("Hello world.", **CONTEXT, glossary={"world": "天下"}) is None
+    cache.close()
+
+
+def test_entries_persist_across_instances(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("Hello world.", "你好，世界。", **CONTEXT)
+    cache.close()
+    cache = make_cache(tmp_path)
+    assert cache.get("Hello world.", **CONTEXT) == "你好，世界。"
+    cache.close()
+
+
+def test_placeholders_are_renumbered(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("See <PLACEHOLDER_ENV_3> and <PLACEHOLDER_CAP_7>.", "见 <PLACEHOLDER_ENV_3> 和 <PLACEHOLDER_CAP_7>。", **CONTEXT)
+    # an insertion earlier in the document shifted the numbering
+    assert (cache.get("See <PLACEHOLDER_ENV_4> and <PLACEHOLDER_CAP_8>.", **CONTEXT)
+            == "见 <PLACEHOLDER_ENV_4> 和 <PLACEHOLDER_CAP_8>。")
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = iter(range(1, 100))
+    monkeypatch.setattr(translation_cache.time, "time", lambda: next(clock))
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put("one", "一", **CONTEXT)
+    cache.put("two", "二", **CONTEXT)
+    assert cache.get("one", **CONTEXT) == "一"  # "two" is now the least recently used
+    cache.put("three", "三", **CONTEXT)
+    assert cache.get("two", **CONTEXT) is None
+    assert cache.get("one", **CONTEXT) == "一"
+    assert cache.get("three", **CONTEXT) == "三"
+    assert cache._size == 2
+    cache.close()
+
+
+def test_delete(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("one", "一", **CONTEXT)
+    cache.delete("one", **CONTEXT)
+    assert cache.get("one", **CONTEXT) is None
+    assert cache._size == 0
+    cache.close()
+
+
+def test_from_config(tmp_path):
+    assert TranslationCache.from_config({}) is None
+    assert TranslationCache.from_config({"translation_cache": {"enabled": False}}) is None
+    cache = TranslationCache.from_config({"translation_cache": {"enabled": True,
+                                                                "path": str(tmp_path / "cache.sqlite3"),
+                                                                "max_entries": 10}})
+    assert cache.max_entries == 10
+    cache.close()